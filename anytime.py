@@ -0,0 +1,92 @@
+'''
+Anytime solving: stop a search at a deadline or after a number of nodes and still have
+the best solution found so far, and hear about every better solution as it is found.
+
+A Limits object is shared by a solver and every solver it spawns (kernel, components),
+so the budget covers the whole solve. Searches call Tick() once per node, and Check()
+between (or during) other long phases; when the limits run out these raise
+SearchInterrupted, which Solve() catches, returning its best.
+'''
+
+import json
+import sys
+import time
+
+# Nodes between clock reads
+CHECK_EVERY = 1024
+
+class SearchInterrupted(Exception):
+    '''
+    Raised inside a search when its Limits have run out.
+    '''
+
+class Limits:
+    def __init__(self, time_limit=None, node_limit=None, cancel=None):
+        '''
+        time_limit: seconds from now (None = no deadline). node_limit: search nodes, over
+        every solver sharing these limits (None = no limit; per process when parallel).
+        cancel: an Event (threading or multiprocessing) that stops the search once set,
+        checked as often as the clock (None = can't be cancelled).
+        '''
+        self.deadline = None if time_limit is None else time.monotonic() + time_limit
+        self.node_limit = node_limit
+        self.cancel = cancel
+        self.nodes = 0
+        self.stopped = False  # Set once a search was cut short: its answer may not be optimal
+
+    def Tick(self): # Count a search node, raising SearchInterrupted once the limits run out
+        self.nodes += 1
+        if self.stopped:
+            raise SearchInterrupted()
+        if self.node_limit is not None and self.nodes > self.node_limit:
+            self.Stop()
+        if self.nodes % CHECK_EVERY == 0 and self.Expired():
+            self.Stop()
+
+    def Check(self): # Between search phases: raise SearchInterrupted if the deadline has passed or on cancel
+        if self.stopped or self.Expired():
+            self.Stop()
+
+    def Expired(self): # Is the deadline past, or the search cancelled?
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            return True
+        return self.cancel is not None and self.cancel.is_set()
+
+    def Stop(self):
+        self.stopped = True
+        raise SearchInterrupted()
+
+    def Remaining(self): # Seconds left before the deadline, or None without one
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+class Incumbent:
+    def __init__(self, size, stations, lower_bound):
+        '''
+        A solution better than any before it. stations is its sorted vertex ids (toll
+        stations, or backup generators for dominating sets), or None when it was found
+        by a method that only yields a count (transposition cache hits, dominating set
+        DP, other processes). lower_bound is the best proven lower bound on the optimum
+        so far, and gap how far size may still be above it, as a fraction of size.
+        '''
+        self.size = size
+        self.stations = None if stations is None else sorted(stations)
+        self.lower_bound = lower_bound
+        self.gap = (size - lower_bound) / size if size else 0.0
+
+    def AsDict(self): # For JSON output
+        return dict(size=self.size, stations=self.stations, lower_bound=self.lower_bound, gap=self.gap)
+
+def JsonLinePrinter(stream=None):
+    '''
+    An on_incumbent callback writing each incumbent as one JSON line, with the seconds
+    since this call, to stream (default: stderr).
+    '''
+    start = time.monotonic()
+
+    def Print(incumbent):
+        line = dict(incumbent.AsDict(), elapsed=round(time.monotonic() - start, 3))
+        print(json.dumps(line), file=stream or sys.stderr, flush=True)
+
+    return Print
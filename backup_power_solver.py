@@ -1,4 +1,11 @@
-import copy
+import sys
+
+from buckets import Pick
+from components import Components
+from core import BaseSolver
+from loader import LoadGraph
+from localsearch import DominatingSetSearch
+from treewidth import MinDominatingSet
 
 '''
 Basic solution to the in-class backup power problem!
@@ -7,6 +14,12 @@ Basic solution to the in-class backup power problem!
 '''
 
 
+# Frame actions for the explicit stack in Solver.BranchIterative
+FRAME_EXPAND = 0        # Evaluate the node for the current state and push its cases: value is its depth
+FRAME_EXCLUDE = 1       # Exclude a vertex (start of the exclude case): value is (vertex, trail length, depth)
+FRAME_UNDO_INCLUDE = 2  # Undo an IncludeVertex
+FRAME_UNDO_EXCLUDE = 3  # Undo an ExcludeVertex
+
 class ProblemState:
     def __init__(self):
         self.included = set()   # Buildings decided to have a generator
@@ -17,11 +30,132 @@ class ProblemState:
     def IsCovered(self, v):
         return v in self.covered
 
-class Solver:
-    def __init__(self):
+class BitsetProblemState:
+    '''
+    ProblemState with each set stored as an int bitmask (bit v set <=> v in set)
+    '''
+    def __init__(self, included=0, excluded=0, undecided=0, covered=0):
+        self.included = included
+        self.excluded = excluded
+        self.undecided = undecided
+        self.covered = covered
+
+    def IsCovered(self, v):
+        return (self.covered >> v) & 1 == 1
+
+class GainBuckets:
+    '''
+    Additional coverage ("gain") of every undecided building, kept in buckets by gain
+    so the building with the most additional coverage is found without a scan.
+    Also counts, for every uncovered building, the undecided buildings that could still
+    cover it, so dead ends and forced generators are known immediately.
+    Covering or deciding a building only touches its closed neighborhood.
+    '''
+    def __init__(self, closed, undecided, covered):
+        num_vertices = len(closed)
+        # closed[v]: v plus its neighbors, i.e. the buildings a generator at v covers
+        self.closed = closed
+        self.undecided = [False] * num_vertices
+        self.covered = [v in covered for v in range(num_vertices)]
+        self.gain = [len(self.closed[v] - covered) for v in range(num_vertices)]
+        self.buckets = [set() for _ in range(max((len(c) for c in self.closed), default=0) + 1)]
+        self.max_gain = 0
+        # dominators[u]: undecided buildings in closed[u]. Uncovered buildings with none
+        # left are counted in dead, those with exactly one are kept in single.
+        self.dominators = [0] * num_vertices
+        self.dead = sum(1 for u in range(num_vertices) if not self.covered[u])
+        self.single = set()
+        for v in undecided:
+            self.Restore(v)
+
+    def Move(self, v, gain):
+        if self.undecided[v]:
+            self.buckets[self.gain[v]].discard(v)
+            self.buckets[gain].add(v)
+            self.max_gain = max(self.max_gain, gain)
+        self.gain[v] = gain
+
+    def Track(self, u, delta): # Count u in dead/single (delta=1) or stop counting it (delta=-1)
+        if self.dominators[u] == 0:
+            self.dead += delta
+        elif self.dominators[u] == 1:
+            if delta > 0:
+                self.single.add(u)
+            else:
+                self.single.discard(u)
+
+    def SetDominators(self, u, count):
+        if not self.covered[u]:
+            self.Track(u, -1)
+            self.dominators[u] = count
+            self.Track(u, 1)
+        else:
+            self.dominators[u] = count
+
+    def Cover(self, buildings): # Buildings just covered no longer count towards anyone's gain
+        for x in buildings:
+            self.Track(x, -1)
+            self.covered[x] = True
+            for v in self.closed[x]:
+                self.Move(v, self.gain[v] - 1)
+
+    def Uncover(self, buildings): # Undoes Cover
+        for x in buildings:
+            self.covered[x] = False
+            self.Track(x, 1)
+            for v in self.closed[x]:
+                self.Move(v, self.gain[v] + 1)
+
+    def Decide(self, v): # v is included or excluded and leaves the buckets
+        self.undecided[v] = False
+        self.buckets[self.gain[v]].discard(v)
+        for u in self.closed[v]:
+            self.SetDominators(u, self.dominators[u] - 1)
+
+    def Restore(self, v): # v is undecided again
+        self.undecided[v] = True
+        self.buckets[self.gain[v]].add(v)
+        self.max_gain = max(self.max_gain, self.gain[v])
+        for u in self.closed[v]:
+            self.SetDominators(u, self.dominators[u] + 1)
+
+    def MaxGain(self): # Largest gain of an undecided building (0 if none is left)
+        while self.max_gain > 0 and not self.buckets[self.max_gain]:
+            self.max_gain -= 1
+        return self.max_gain
+
+    def Best(self): # An undecided building with the most additional coverage, None if all are decided
+        if not self.buckets[self.MaxGain()]:
+            return None
+        v, self.buckets[self.max_gain] = Pick(self.buckets[self.max_gain])
+        return v
+
+    def Forced(self): # The only undecided building able to cover some uncovered building, or None
+        if not self.single:
+            return None
+        u, self.single = Pick(self.single)
+        return next(v for v in self.closed[u] if self.undecided[v])
+
+class Solver(BaseSolver):
+    problem = "dominating_set"
+
+    def __init__(self, graph_adj=None, engine="iterative", components=True, max_width=5,
+                 local_search=0, limits=None, on_incumbent=None, stats=None):
+        if engine not in ENGINES:
+            raise ValueError(f"unknown search engine {engine!r}, expected one of {sorted(ENGINES)}")
+        super().__init__(components, max_width, local_search, limits, on_incumbent, stats)
+        self.engine = engine  # "clone" copies the state per branch, "iterative" mutates one state in place
+        if stats is not None:
+            self.LowerBound = stats.Timed(self.LowerBound)
+            self.FindForced = stats.Timed(self.FindForced)
         self.best = 0
+        self.trail = []          # (vertex, included) decisions made by the iterative engine, in order
+        self.base = ([], [])     # (included, excluded) of the state the iterative search started from
+        self.gains = None  # GainBuckets while a single state is being searched in place
         self.graph_adj = []
-        self.graph_mat = []
+        self.closed = []       # closed[v]: v plus every building adjacent to v
+        if graph_adj is not None:
+            self.SetGraph(graph_adj)
 
     def Load(self, filename):
         '''
@@ -30,99 +164,353 @@ class Solver:
         - Each pair of lines after the first describe the connections for a vertex.
             - Number of connections, then vertex ids of vertices connected
         '''
-        with open(filename, "r") as fp:
-            num_vertices = int(fp.readline().strip())
-            self.graph_adj = [None for i in range(num_vertices)]
-            self.graph_mat = [[False for j in range(num_vertices)] for i in range(num_vertices)]
-            for v in range(num_vertices):
-                num_connections = int(fp.readline().strip())
-                self.graph_adj[v] = frozenset({int(conn) for conn in fp.readline().split(" ")})
-                for conn in self.graph_adj[v]:
-                    self.graph_mat[v][conn] = True
+        # Read in bulk into a CSR adjacency (see loader.py) rather than line by line,
+        # or map a graph already converted to the binary format
+        self.SetGraph(LoadGraph(filename, "adjacency"))
+
+    def SetGraph(self, graph_adj):
+        '''
+        Use an in-memory graph: graph_adj[v] is the set of buildings connected to v
+        '''
+        num_vertices = len(graph_adj)
+        self.graph_adj = [frozenset(graph_adj[v]) for v in range(num_vertices)]
+        self.closed = [self.graph_adj[v] | {v} for v in range(num_vertices)]
+        self.best = num_vertices  # A generator in every building always works
+        self.best_generators = list(range(num_vertices))
+
+    def Options(self):
+        # Constructor options, to build an equivalent solver in another process
+        # (not on_incumbent: spawned solvers and parallel workers pass improvements up through report)
+        return dict(engine=self.engine, components=self.components, max_width=self.max_width,
+                    local_search=self.local_search, limits=self.limits, stats=self.stats)
+
+    def Spawn(self, graph_adj):
+        # A solver with the same representation and options for another graph
+        sub = type(self)(graph_adj, **self.Options())
+        sub.spawned = True
+        return sub
+
+    def Improve(self, state): # Record a full cover with fewer generators than best
+        self.ImproveTo(self.NumIncluded(state), list(self.Members(state.included)))
+
+    @property
+    def best_generators(self): # Buildings with a generator in the best solution, None if only its size is known
+        return self.best_solution
+
+    @best_generators.setter
+    def best_generators(self, generators):
+        self.best_solution = generators
+
+    @property
+    def graph(self): # The graph as BaseSolver names it
+        return self.graph_adj
+
+    def NewState(self):
+        state = ProblemState()
+        state.undecided = {i for i in range(len(self.graph_adj))}
+        return state
+
+    def clone(self, state: ProblemState):
+        # Copy only the four sets -- cheaper than copy.deepcopy
+        new_state = ProblemState()
+        new_state.included = set(state.included)
+        new_state.excluded = set(state.excluded)
+        new_state.undecided = set(state.undecided)
+        new_state.covered = set(state.covered)
+        return new_state
+
+    def NumCovered(self, state: ProblemState):
+        return len(state.covered)
+
+    def NumIncluded(self, state: ProblemState):
+        return len(state.included)
+
+    def NumUndecided(self, state: ProblemState):
+        return len(state.undecided)
+
+    def Members(self, buildings):
+        # The building ids in one of the state's sets
+        return buildings
+
+    def Uncovered(self, state: ProblemState):
+        return [u for u in range(len(self.graph_adj)) if u not in state.covered]
+
+    def Dominators(self, state: ProblemState, u: int):
+        # Undecided buildings that would cover u
+        return [v for v in self.closed[u] if v in state.undecided]
+
+    def Gain(self, state: ProblemState, v: int):
+        # Additional coverage if v is included: any connections not already
+        #  covered plus 1 if v is not covered
+        return len(self.closed[v] - state.covered)
+
+    def NewGains(self, state: ProblemState):
+        return GainBuckets(self.closed, self.Members(state.undecided), set(self.Members(state.covered)))
 
     def IncludeVertex(self, state: ProblemState, id: int):
+        '''
+        Place a generator at id. Returns the buildings it newly covered so
+        UndoInclude can take them back out.
+        '''
+        # Buildings covered by id (itself and its neighbors) that weren't covered yet
+        newly_covered = self.closed[id] - state.covered
         # Add building to included
         state.included.add(id)
         # Remove building from undecided
         state.undecided.remove(id)
-        # Cover included building
-        state.covered.add(id)
-        # Cover all buildings adjacent to included id
-        state.covered.update(self.graph_adj[id])
+        # Cover included building and all buildings adjacent to it
+        state.covered.update(newly_covered)
+        if self.gains is not None:
+            self.gains.Decide(id)
+            self.gains.Cover(newly_covered)
+        return newly_covered
+
+    def UndoInclude(self, state: ProblemState, id: int, newly_covered):
+        state.included.remove(id)
+        state.undecided.add(id)
+        state.covered.difference_update(newly_covered)
+        if self.gains is not None:
+            self.gains.Uncover(newly_covered)
+            self.gains.Restore(id)
 
     def ExcludeVertex(self, state: ProblemState, id: int):
         state.excluded.add(id)
         state.undecided.remove(id)
+        if self.gains is not None:
+            self.gains.Decide(id)
+
+    def UndoExclude(self, state: ProblemState, id: int):
+        state.excluded.remove(id)
+        state.undecided.add(id)
+        if self.gains is not None:
+            self.gains.Restore(id)
 
     def FindNextVertex(self, state: ProblemState):
         '''
         Pick building that would add the most additional coverage
         '''
+        # O(1) amortized from the gain buckets when searching a single state in place
+        if self.gains is not None:
+            return self.gains.Best()
         max_cov = None
         next_v = None
         for v in state.undecided:
-            # Additional coverage if v is included: any connections not already
-            #  covered plus 1 if v is not covered
-            additional_cov = len(self.graph_adj[v] - state.covered) + int(not state.IsCovered(v))
+            additional_cov = self.Gain(state, v)
             if max_cov is None or additional_cov > max_cov:
                 max_cov = additional_cov
                 next_v = v
         return next_v
 
-    def Solve(self):
+    def LowerBound(self, state, max_gain=None):
+        '''
+        Admissible bound on the generators still needed: no generator covers more than the
+        current best gain, so the uncovered buildings need at least that many more.
+        max_gain is that gain when the caller already has it, saving a scan.
+        '''
+        uncovered = len(self.graph_adj) - self.NumCovered(state)
+        if uncovered == 0:
+            return 0
+        if max_gain is None and self.gains is not None:
+            max_gain = self.gains.MaxGain()
+        elif max_gain is None:
+            next_v = self.FindNextVertex(state)
+            max_gain = 0 if next_v is None else self.Gain(state, next_v)
+        if max_gain == 0:
+            # Nothing undecided covers anything new: this branch can't finish
+            return len(self.graph_adj) + 1
+        return -(-uncovered // max_gain)
+
+    def FindForced(self, state):
         '''
-        Solve for loaded graph
+        Returns (dead, forced). dead: some uncovered building has no undecided building
+        left that could cover it. forced: the only undecided building able to cover some
+        uncovered building, which every solution in this branch must include (or None).
         '''
+        if self.gains is not None:
+            return self.gains.dead > 0, self.gains.Forced()
+        forced = None
+        for u in self.Uncovered(state):
+            dominators = self.Dominators(state, u)
+            if not dominators:
+                return True, None
+            if len(dominators) == 1 and forced is None:
+                forced = dominators[0]
+        return False, forced
+
+    def RootBound(self): # Proven lower bound before searching
+        return self.LowerBound(self.NewState())
+
+    def SolveOptimum(self): # Solve's search for the optimum, without limit handling
+        if self.components:
+            parts = Components(self.graph_adj)
+            if len(parts) > 1:
+                return self.SolveComponents(parts)
+        if self.SolveDecomposition() is not None:
+            return self.best
+
         # Create initial problem state
-        init_state = ProblemState()
-        init_state.undecided = {i for i in range(len(self.graph_adj))}
+        init_state = self.NewState()
+
+        # Use FindNextVertex (and local search) to get a decent initial best-so-far
+        # solution to help with bounding
+        self.Offer(self.HeuristicSet())
+        if self.limits is not None:
+            self.limits.Check()
+        # self.best = len(self.graph_adj)
 
-        # Use FindNextVertex to get a decent initial best-so-far solution
-        # to help with bounding
-        greedy_state = copy.deepcopy(init_state)
-        while len(greedy_state.covered) < len(self.graph_adj):
+        return self.Search(init_state)
+
+    def DecompositionSolve(self, decomposition): # SolveDecomposition's DP, which only finds the size
+        count = MinDominatingSet(self.graph_adj, decomposition)
+        if count < self.best:
+            self.ImproveTo(count)
+
+    def Greedy(self, state):
+        '''
+        Keep including the building with the most additional coverage until everything
+        is covered. Returns the resulting state (state itself is left untouched).
+        '''
+        greedy_state = self.clone(state)
+        self.gains = self.NewGains(greedy_state)
+        while self.NumCovered(greedy_state) < len(self.graph_adj):
             self.IncludeVertex(
                 greedy_state,
                 self.FindNextVertex(greedy_state)
             )
-        self.best = len(greedy_state.included)
-        # self.best = len(self.graph_adj)
+        self.gains = None
+        return greedy_state
+
+    def HeuristicSet(self):
+        '''
+        The buildings of the greedy solution, improved by local_search seconds of local
+        search. Stops early if it reaches the lower bound, since nothing smaller exists.
+        '''
+        state = self.NewState()
+        generators = list(self.Members(self.Greedy(state).included))
+        if self.local_search:
+            target = self.LowerBound(state)
+            seconds = self.local_search
+            if self.limits is not None and self.limits.deadline is not None:
+                seconds = min(seconds, self.limits.Remaining())
+            if len(generators) > target:
+                stop = None if self.limits is None else self.limits.Expired
+                generators = DominatingSetSearch(self.graph_adj, generators).Run(seconds=seconds, target=target, stop=stop)
+        return generators
+
+    def Search(self, state):
+        '''
+        Search from state with the configured engine
+        '''
+        if self.engine == "iterative":
+            # The clone engine copies states, so only the in-place engine keeps gain buckets
+            self.gains = self.NewGains(state)
+            self.trail = []
+            self.base = (list(self.Members(state.included)), list(self.Members(state.excluded)))
+            self.BranchIterative(state)
+            self.gains = None
+            return self.best
+        return self.Branch(state)
 
-        return self.Branch(init_state)
+    def Donate(self, stack):
+        '''
+        Take the shallowest exclude case still waiting on BranchIterative's stack off the
+        stack and return it as an (included, excluded) subproblem for another worker.
+        Returns None when there is nothing left to give away.
+        '''
+        for i, (action, value) in enumerate(stack):
+            if action == FRAME_EXCLUDE:
+                next_node, mark, _ = value
+                del stack[i]
+                included, excluded = list(self.base[0]), list(self.base[1])
+                for v, was_included in self.trail[:mark]:
+                    (included if was_included else excluded).append(v)
+                excluded.append(next_node)
+                return (included, excluded)
+        return None
 
-    def Branch(self, state: ProblemState):
+    def Split(self, state, depth):
+        '''
+        Expand the top depth levels of the search from state and return the open nodes
+        below them as (included, excluded) lists. Together the parts cover every
+        solution under state that could beat best.
+        '''
+        parts = []
+        self.SplitNode(state, depth, [], [], parts)
+        return parts
+
+    def SplitNode(self, state, depth, included, excluded, parts):
+        if self.NumCovered(state) == len(self.graph_adj):
+            if self.NumIncluded(state) < self.best:
+                self.Improve(state)
+            return
+        if self.NumUndecided(state) == 0:
+            return
+        next_node = self.FindNextVertex(state)
+        if self.NumIncluded(state) + self.LowerBound(state, self.Gain(state, next_node)) >= self.best:
+            return
+        if depth == 0:
+            parts.append((list(included), list(excluded)))
+            return
+        newly_covered = self.IncludeVertex(state, next_node)
+        included.append(next_node)
+        self.SplitNode(state, depth - 1, included, excluded, parts)
+        included.pop()
+        self.UndoInclude(state, next_node, newly_covered)
+        self.ExcludeVertex(state, next_node)
+        excluded.append(next_node)
+        self.SplitNode(state, depth - 1, included, excluded, parts)
+        excluded.pop()
+        self.UndoExclude(state, next_node)
+
+    def Branch(self, state: ProblemState, depth=0):
         '''
         Given a state (i.e., candidate solution) with some decision made,
             return the best possible solution
         '''
+        if self.shared_best is not None:
+            self.Sync()
+        if self.limits is not None:
+            self.limits.Tick()
+        if self.stats is not None:
+            self.stats.Node(depth)
         # Have we covered everything?
-        if (len(state.covered) == len(self.graph_adj)):
-            if len(state.included) < self.best:
-                self.best = len(state.included)
+        if (self.NumCovered(state) == len(self.graph_adj)):
+            if self.NumIncluded(state) < self.best:
+                self.Improve(state)
             return self.best
 
         # If we've made all possible decisions
-        if (len(state.undecided) == 0):
+        if (self.NumUndecided(state) == 0):
+            self.Pruned("infeasible")
             return self.best
 
-        # Bounding based on best found so far
-        if (len(state.included) + 1 >= self.best):
+        # The clone engine has no gain buckets, so finding the building with the most
+        # additional coverage is a scan: do it once for both the bound and the branching
+        next_node = self.FindNextVertex(state)
+
+        # Bounding based on best found so far and what the uncovered buildings still need
+        if (self.NumIncluded(state) + self.LowerBound(state, self.Gain(state, next_node)) >= self.best):
+            self.Pruned("lower_bound")
             return self.best
 
-        # <--- any optimizations to make the problem smaller that you want to run
-        #      many times ---->
+        # Dead end, or a building only one undecided building can still cover
+        dead, forced = self.FindForced(state)
+        if dead:
+            self.Pruned("infeasible")
+            return self.best
+        if forced is not None:
+            self.IncludeVertex(state, forced)
+            return self.Branch(state, depth + 1)
 
         # <--- Maybe? Re-run your greedy algorithm to see if it does better --->
 
-        # Figure out next vertex to decide include vs exclude
-        next_node = self.FindNextVertex(state)
         # Include
-        inc_state = copy.deepcopy(state)
+        inc_state = self.clone(state)
         self.IncludeVertex(inc_state, next_node)
-        best_inc = self.Branch(inc_state)
+        best_inc = self.Branch(inc_state, depth + 1)
         # Exclude
         self.ExcludeVertex(state, next_node)
-        best_exc = self.Branch(state)
+        best_exc = self.Branch(state, depth + 1)
 
         # if best_inc is None and best_exc is None: return None
         # if best_inc is None: return best_exc
@@ -130,8 +518,179 @@ class Solver:
         return min(best_inc, best_exc)
         # return best_inc if len(best_inc) <= len(best_exc) else best_exc
 
-if __name__ == "__main__":
+    def BranchIterative(self, state):
+        '''
+        Branch driven by an explicit stack of (action, value) frames instead of recursion.
+        Decisions are applied to the one state and undone afterwards, so large graphs are
+        not limited by Python's recursion limit and no state is copied.
+        '''
+        num_vertices = len(self.graph_adj)
+        stack = [(FRAME_EXPAND, 0)]
+        while stack:
+            action, value = stack.pop()
+            if action == FRAME_UNDO_INCLUDE:
+                self.UndoInclude(state, *value)
+                self.trail.pop()
+                continue
+            if action == FRAME_UNDO_EXCLUDE:
+                self.UndoExclude(state, value)
+                self.trail.pop()
+                continue
+            if action == FRAME_EXCLUDE:
+                self.ExcludeVertex(state, value[0])
+                self.trail.append((value[0], False))
+                stack.append((FRAME_UNDO_EXCLUDE, value[0]))
+                stack.append((FRAME_EXPAND, value[2]))
+                continue
+
+            # Same checks as Branch
+            depth = value
+            if self.shared_best is not None:
+                self.Sync()
+            if self.limits is not None:
+                self.limits.Tick()
+            if self.stats is not None:
+                self.stats.Node(depth)
+            if self.share_work is not None:
+                self.share_work(stack)
+            if self.NumCovered(state) == num_vertices:
+                if self.NumIncluded(state) < self.best:
+                    self.Improve(state)
+                continue
+            if self.NumUndecided(state) == 0:
+                self.Pruned("infeasible")
+                continue
+            if self.NumIncluded(state) + self.LowerBound(state) >= self.best:
+                self.Pruned("lower_bound")
+                continue
+            dead, forced = self.FindForced(state)
+            if dead:
+                self.Pruned("infeasible")
+                continue
+            if forced is not None:
+                newly_covered = self.IncludeVertex(state, forced)
+                self.trail.append((forced, True))
+                stack.append((FRAME_UNDO_INCLUDE, (forced, newly_covered)))
+                stack.append((FRAME_EXPAND, depth + 1))
+                continue
+
+            # Frames run last-in first-out: include case, undo it, then the exclude case
+            next_node = self.FindNextVertex(state)
+            stack.append((FRAME_EXCLUDE, (next_node, len(self.trail), depth + 1)))
+            newly_covered = self.IncludeVertex(state, next_node)
+            self.trail.append((next_node, True))
+            stack.append((FRAME_UNDO_INCLUDE, (next_node, newly_covered)))
+            stack.append((FRAME_EXPAND, depth + 1))
+        return self.best
+
+class BitsetSolver(Solver):
+    '''
+    Same search as Solver, but every set in the state is an int bitmask.
+    Cloning copies four ints and coverage gains are a mask and a popcount.
+    '''
+    def SetGraph(self, graph_adj):
+        super().SetGraph(graph_adj)
+        # cover_masks[v]: v plus every building adjacent to v
+        self.cover_masks = [0] * len(self.graph_adj)
+        for v in range(len(self.graph_adj)):
+            for conn in self.closed[v]:
+                self.cover_masks[v] |= 1 << conn
 
-    solver = Solver()
-    solver.Load("chain.txt")
-    print(solver.Solve())
+    def NewState(self):
+        return BitsetProblemState(undecided=(1 << len(self.graph_adj)) - 1)
+
+    def clone(self, state: BitsetProblemState):
+        return BitsetProblemState(state.included, state.excluded, state.undecided, state.covered)
+
+    def NumCovered(self, state: BitsetProblemState):
+        return state.covered.bit_count()
+
+    def NumIncluded(self, state: BitsetProblemState):
+        return state.included.bit_count()
+
+    def NumUndecided(self, state: BitsetProblemState):
+        return state.undecided.bit_count()
+
+    def Uncovered(self, state: BitsetProblemState):
+        return self.Members(((1 << len(self.graph_adj)) - 1) & ~state.covered)
+
+    def Dominators(self, state: BitsetProblemState, u: int):
+        return self.Members(self.cover_masks[u] & state.undecided)
+
+    def Gain(self, state: BitsetProblemState, v: int):
+        return (self.cover_masks[v] & ~state.covered).bit_count()
+
+    def Members(self, buildings):
+        ids = []
+        while buildings:
+            low = buildings & -buildings
+            ids.append(low.bit_length() - 1)
+            buildings ^= low
+        return ids
+
+    def IncludeVertex(self, state: BitsetProblemState, id: int):
+        bit = 1 << id
+        newly_covered = self.cover_masks[id] & ~state.covered
+        state.included |= bit
+        state.undecided &= ~bit
+        state.covered |= newly_covered
+        if self.gains is not None:
+            self.gains.Decide(id)
+            self.gains.Cover(self.Members(newly_covered))
+        return newly_covered
+
+    def UndoInclude(self, state: BitsetProblemState, id: int, newly_covered):
+        bit = 1 << id
+        state.included &= ~bit
+        state.undecided |= bit
+        state.covered &= ~newly_covered
+        if self.gains is not None:
+            self.gains.Uncover(self.Members(newly_covered))
+            self.gains.Restore(id)
+
+    def ExcludeVertex(self, state: BitsetProblemState, id: int):
+        bit = 1 << id
+        state.excluded |= bit
+        state.undecided &= ~bit
+        if self.gains is not None:
+            self.gains.Decide(id)
+
+    def UndoExclude(self, state: BitsetProblemState, id: int):
+        bit = 1 << id
+        state.excluded &= ~bit
+        state.undecided |= bit
+        if self.gains is not None:
+            self.gains.Restore(id)
+
+    def FindNextVertex(self, state: BitsetProblemState):
+        '''
+        Pick building that would add the most additional coverage
+        '''
+        if self.gains is not None:
+            return self.gains.Best()
+        max_cov = None
+        next_v = None
+        undecided = state.undecided
+        while undecided:
+            low = undecided & -undecided
+            v = low.bit_length() - 1
+            undecided ^= low
+            additional_cov = self.Gain(state, v)
+            if max_cov is None or additional_cov > max_cov:
+                max_cov = additional_cov
+                next_v = v
+        return next_v
+
+# Available search engines, selectable with --engine
+ENGINES = ("clone", "iterative")
+
+# Available problem state representations, selectable with --state
+SOLVERS = {
+    "set": Solver,
+    "bitset": BitsetSolver,
+}
+
+if __name__ == "__main__":
+    # Same command line as "python3 solve.py dominating-set"
+    from solve import Main
+    Main(["dominating-set"] + sys.argv[1:], profile="backup_power.prof")
@@ -0,0 +1,105 @@
+'''
+Batch solving: many graphs in one process (or one pool of processes) instead of one
+interpreter start per graph, with one JSON line per graph on stdout. Run through
+solve.py --batch, with the usual solver flags applying to every graph:
+
+python3 solve.py vc --batch graphs/ --jobs 4 --engine iterative
+cat a.txt b.txt | python3 solve.py vc --batch   (graphs separated by --- lines)
+
+Graphs come from every file in a directory (in name order; text or binary), or from
+a stream of text graphs separated by lines holding only "---", like the documents of
+a YAML stream. A separator is needed since edge list files may end with notes.
+
+Each line is {"graph", "result", "solution", "lower_bound", "stopped", "seconds"},
+plus "stats" with --stats, or {"graph", "error"} for a graph that couldn't be read or
+solved; the rest of the batch carries on. graph is the file name, or "<stdin>:i"
+for the i-th document of a stream (counting from 0). With --jobs, lines come out in
+the order graphs finish.
+'''
+
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+
+from anytime import Limits
+from loader import LoadGraph, ParseGraph, ReadBytes
+from solve import BuildSolver, IsVertexCover, Run, Solution, Source
+from stats import SearchStats
+
+# Graphs handed to a pool process at a time: enough to amortize the round trip for
+# small graphs without leaving one process holding a queue of big ones
+CHUNK_SIZE = 4
+
+# A line holding only --- separates the graphs of a stream
+SEPARATOR = re.compile(rb"^---[ \t]*\r?$", re.MULTILINE)
+
+# Per-process arguments for pool workers, set up once by InitWorker
+worker = {}
+
+def Documents(data):
+    # The graphs of a stream, as bytes; blank documents (e.g. after a final ---) are skipped
+    return [document.lstrip() for document in SEPARATOR.split(data) if document.strip()]
+
+def Inputs(source=None):
+    '''
+    (name, path, data) for every graph in source: the files of a directory (data None,
+    read by whoever solves it), or the documents of a file or of stdin (source None).
+    '''
+    if source is not None and os.path.isdir(source):
+        for name in sorted(os.listdir(source)):
+            path = os.path.join(source, name)
+            if os.path.isfile(path) and not name.startswith("."):
+                yield name, path, None
+        return
+    label = "<stdin>" if source is None else source
+    for i, document in enumerate(Documents(ReadBytes(source))):
+        yield f"{label}:{i}", None, document
+
+def SolveInput(args, item):
+    # Solve one (name, path, data) graph as args ask; the JSON line for it as a dict
+    name, path, data = item
+    try:
+        keep_sets = IsVertexCover(args)
+        graph = LoadGraph(path, args.format, keep_sets) if data is None else ParseGraph(data, args.format, keep_sets)
+        limits = Limits(args.time_limit, args.node_limit)
+        stats = SearchStats() if args.stats else None
+        solver = BuildSolver(args, graph, limits, stats)
+        start = time.perf_counter()
+        result = Run(args, solver)
+        line = dict(graph=name, result=result, solution=None if args.heuristic else Solution(solver),
+                    lower_bound=solver.lower_bound,
+                    stopped=limits.stopped, seconds=round(time.perf_counter() - start, 6))
+        if stats is not None:
+            line["stats"] = stats.AsDict()
+        return line
+    except Exception as error:
+        return dict(graph=name, error=f"{type(error).__name__}: {error}")
+
+def InitWorker(args):
+    worker["args"] = args
+
+def SolvePart(item):
+    return SolveInput(worker["args"], item)
+
+def Batch(args, source=None, jobs=1):
+    '''
+    Solve every graph in source (see Inputs) as args ask, yielding the result dicts.
+    jobs > 1 solves them on a pool of that many processes, in the order they finish.
+    '''
+    if jobs <= 1:
+        for item in Inputs(source):
+            yield SolveInput(args, item)
+        return
+    with multiprocessing.Pool(jobs, initializer=InitWorker, initargs=(args,)) as pool:
+        yield from pool.imap_unordered(SolvePart, Inputs(source), chunksize=CHUNK_SIZE)
+
+def RunBatch(args, stream=None):
+    # Write the JSON line for every graph to stream (default: stdout); returns how many failed
+    failed = 0
+    for line in Batch(args, Source(args), args.jobs):
+        failed += "error" in line
+        print(json.dumps(line), file=stream or sys.stdout, flush=True)
+    return failed
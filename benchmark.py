@@ -0,0 +1,196 @@
+'''
+Benchmark harness: runs solver variants on generated and named graphs (see
+generators.py) with warmup runs and repetitions, and records for each pair the answer,
+wall time of Solve() (every repetition, plus median and minimum), search nodes and
+peak memory in a JSON results file.
+
+Given a baseline (an earlier results file), every pair found in both is compared and
+regressions are flagged: a different answer, a median time, node count or peak memory
+more than --tolerance above the baseline's, or a run that now hits the time limit.
+The exit status is 1 if there are any, so the harness can gate changes.
+
+Nodes are counted through anytime.Limits. Peak memory is the tracemalloc peak of one
+extra untimed run, since tracing slows Python allocations down a lot.
+
+python3 benchmark.py --output before.json
+python3 benchmark.py --baseline before.json --output after.json
+python3 benchmark.py --graphs gnp:60:0.1:1 regular:40:3:2 --variants vc-iterative vc-undo --repeat 5
+'''
+
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import backup_power_solver
+import main
+from anytime import Limits
+from generators import Generate
+
+# Options leaving branch and bound to do the work, so variants comparing engines, state
+# representations or branching policies search instead of only preprocessing
+VC_SEARCH = dict(preprocess="none", max_width=0)
+DS_SEARCH = dict(max_width=0)
+
+# Solver variants: name -> (problem, state representation, constructor options)
+VARIANTS = {
+    "vc-default": ("vertex_cover", "set", dict(engine="iterative")),
+    "vc-clone": ("vertex_cover", "set", dict(engine="clone", **VC_SEARCH)),
+    "vc-undo": ("vertex_cover", "set", dict(engine="undo", **VC_SEARCH)),
+    "vc-iterative": ("vertex_cover", "set", dict(engine="iterative", **VC_SEARCH)),
+    "vc-bitset-iterative": ("vertex_cover", "bitset", dict(engine="iterative", **VC_SEARCH)),
+    "vc-max-degree": ("vertex_cover", "set", dict(engine="iterative", branching="max_degree", bounds=("matching",), **VC_SEARCH)),
+    # Branch and bound alone: no kernel, tree decomposition or component splitting
+    "vc-search-only": ("vertex_cover", "set", dict(engine="iterative", components=False, **VC_SEARCH)),
+    "ds-default": ("dominating_set", "set", dict(engine="iterative")),
+    "ds-clone": ("dominating_set", "set", dict(engine="clone", **DS_SEARCH)),
+    "ds-iterative": ("dominating_set", "set", dict(engine="iterative", **DS_SEARCH)),
+    "ds-bitset-iterative": ("dominating_set", "bitset", dict(engine="iterative", **DS_SEARCH)),
+    "ds-search-only": ("dominating_set", "set", dict(engine="iterative", components=False, **DS_SEARCH)),
+}
+# The clone engine never forces a neighbor's station when excluding a system, so its
+# search is exponential even on small random graphs: only run it when asked for
+DEFAULT_VARIANTS = [name for name in VARIANTS if name != "vc-clone"]
+
+# Graph specs (see generators.Generate) run by each suite
+SUITES = {
+    "quick": [
+        "named:petersen", "named:heawood", "named:loupekine_snark", "complete:12", "grid:4:6",
+        "gnp:30:0.2:1", "regular:24:3:1",
+    ],
+    "full": [
+        "named:petersen", "named:heawood", "named:loupekine_snark", "named:complete20", "grid:5:10",
+        "gnp:40:0.2:1", "gnp:60:0.1:1", "gnp:70:0.1:3", "regular:40:3:2", "regular:50:4:3",
+    ],
+}
+
+PROBLEMS = {
+    "vertex_cover": main.SOLVERS,
+    "dominating_set": backup_power_solver.SOLVERS,
+}
+
+def RunOnce(variant, graph, time_limit):
+    # Solve graph once with variant: (answer, seconds, nodes, stopped by the time limit)
+    problem, state, options = VARIANTS[variant]
+    limits = Limits(time_limit)
+    solver = PROBLEMS[problem][state](graph, limits=limits, **options)
+    gc.collect()
+    start = time.perf_counter()
+    answer = solver.Solve()
+    elapsed = time.perf_counter() - start
+    return answer, elapsed, limits.nodes, limits.stopped
+
+def PeakMemory(variant, graph, time_limit):
+    # Peak bytes allocated by Python while constructing and running the solver
+    tracemalloc.start()
+    try:
+        RunOnce(variant, graph, time_limit)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def Benchmark(specs, variants, repeat=3, warmup=1, time_limit=60.0, memory=True, log=None):
+    '''
+    Results for every graph spec and variant: a list of dicts with keys graph, variant,
+    answer, stopped, times, median, min, nodes and peak_kb (None without memory).
+    log(result), if given, is called as each one is done.
+    '''
+    results = []
+    for spec in specs:
+        graph = Generate(spec)
+        for variant in variants:
+            for _ in range(warmup):
+                RunOnce(variant, graph, time_limit)
+            runs = [RunOnce(variant, graph, time_limit) for _ in range(repeat)]
+            times = [elapsed for _, elapsed, _, _ in runs]
+            answer, _, nodes, stopped = runs[-1]
+            result = dict(graph=spec, variant=variant, answer=answer, stopped=any(run[3] for run in runs),
+                          times=times, median=statistics.median(times), min=min(times), nodes=nodes,
+                          peak_kb=PeakMemory(variant, graph, time_limit) // 1024 if memory else None)
+            results.append(result)
+            if log is not None:
+                log(result)
+    return results
+
+def Disagreements(results):
+    # Graphs where variants for the same problem finished with different answers
+    answers = {}
+    for result in results:
+        if not result["stopped"]:
+            key = (result["graph"], VARIANTS[result["variant"]][0])
+            answers.setdefault(key, set()).add(result["answer"])
+    return [f"{graph}: {problem} variants disagree: {sorted(found)}"
+            for (graph, problem), found in answers.items() if len(found) > 1]
+
+def Regressions(results, baseline, tolerance=0.2, min_delta=0.005):
+    '''
+    Messages for every result worse than the baseline result for the same graph and
+    variant. Times count only when more than min_delta seconds slower as well, so noise
+    on very fast runs isn't flagged.
+    '''
+    previous = {(result["graph"], result["variant"]): result for result in baseline}
+    flags = []
+    for result in results:
+        old = previous.get((result["graph"], result["variant"]))
+        if old is None:
+            continue
+        name = f"{result['graph']} {result['variant']}"
+        if result["stopped"] and not old["stopped"]:
+            flags.append(f"{name}: now stopped by the time limit")
+            continue
+        if not result["stopped"] and not old["stopped"] and result["answer"] != old["answer"]:
+            flags.append(f"{name}: answer {result['answer']}, was {old['answer']}")
+        if result["median"] > old["median"] * (1 + tolerance) and result["median"] - old["median"] > min_delta:
+            flags.append(f"{name}: median {result['median']:.4f}s, was {old['median']:.4f}s")
+        if result["nodes"] > old["nodes"] * (1 + tolerance):
+            flags.append(f"{name}: {result['nodes']} nodes, was {old['nodes']}")
+        if result["peak_kb"] is not None and old.get("peak_kb") is not None \
+                and result["peak_kb"] > old["peak_kb"] * (1 + tolerance):
+            flags.append(f"{name}: peak {result['peak_kb']} KiB, was {old['peak_kb']} KiB")
+    return flags
+
+def PrintResult(result):
+    peak = "-" if result["peak_kb"] is None else f"{result['peak_kb']} KiB"
+    stopped = " (time limit)" if result["stopped"] else ""
+    print(f"{result['graph']:<24} {result['variant']:<20} answer {result['answer']:<5} "
+          f"median {result['median']:.4f}s  min {result['min']:.4f}s  nodes {result['nodes']:<8} peak {peak}{stopped}",
+          flush=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the solvers and flag regressions against a baseline.")
+    parser.add_argument("--suite", choices=SUITES, default="quick", help="graphs to run (default: quick)")
+    parser.add_argument("--graphs", nargs="+", metavar="SPEC",
+                        help="graph specs instead of a suite, e.g. gnp:60:0.1:1 regular:40:3:2 grid:5:8 named:petersen")
+    parser.add_argument("--variants", nargs="+", choices=VARIANTS, default=DEFAULT_VARIANTS,
+                        help="solver variants to run (default: all but vc-clone)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per graph and variant (default: 3)")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed runs before those (default: 1)")
+    parser.add_argument("--time-limit", type=float, default=60, metavar="SECONDS",
+                        help="stop any one run after this long (default: 60)")
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="skip the peak memory runs")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="fraction above the baseline that counts as a regression (default: 0.2)")
+    parser.add_argument("--min-delta", type=float, default=0.005, metavar="SECONDS",
+                        help="smallest slowdown that counts as a regression (default: 0.005)")
+    args = parser.parse_args()
+
+    specs = args.graphs or SUITES[args.suite]
+    results = Benchmark(specs, args.variants, args.repeat, args.warmup, args.time_limit, args.memory, PrintResult)
+    if args.output:
+        with open(args.output, "w") as fp:
+            json.dump(dict(python=platform.python_version(), platform=platform.platform(),
+                           created=time.strftime("%Y-%m-%dT%H:%M:%S"), repeat=args.repeat, warmup=args.warmup,
+                           results=results), fp, indent=1)
+    flags = Disagreements(results)
+    if args.baseline:
+        with open(args.baseline) as fp:
+            flags += Regressions(results, json.load(fp)["results"], args.tolerance, args.min_delta)
+    for flag in flags:
+        print("REGRESSION", flag)
+    sys.exit(1 if flags else 0)
@@ -0,0 +1,30 @@
+'''
+Picking from the sets of a bucket queue. A set never shrinks its table when entries
+leave it, so a bucket that once held many vertices keeps that many slots, and finding
+its few live entries means scanning the empty ones. next(iter()) scans from the start
+of the table every time; pop() resumes where the last pop() stopped, but a vertex
+added back lands behind that point, so picking the same vertex again wraps around the
+whole table. Either way one pick costs the table size, not the bucket size.
+
+Pick rebuilds a bucket once its table is mostly empty slots, which bounds a pick by a
+constant times the bucket size, and pops and adds back otherwise, so picking through a
+bucket that still has many entries stays linear overall.
+'''
+
+import sys
+
+# Table bytes per live entry (plus a small set's minimum) above which a bucket is rebuilt; a freshly
+# built set stays under 48, so rebuilding only happens after many removals
+SPARSE_BYTES = 256
+MIN_ENTRIES = 8
+
+def Pick(bucket):
+    '''
+    (v, bucket): some element v of the nonempty set bucket, left in it, and the set to
+    keep in place of bucket, which is a rebuilt copy when bucket was mostly empty slots.
+    '''
+    if sys.getsizeof(bucket) > SPARSE_BYTES * (len(bucket) + MIN_ENTRIES):
+        bucket = set(bucket)
+    v = bucket.pop()
+    bucket.add(v)
+    return v, bucket
@@ -0,0 +1,67 @@
+'''
+Transposition cache for branch and bound: what is known about a residual subproblem
+that has already been searched, so reaching it again by another path is free.
+
+Entries map a canonical key of the subproblem to (value, exact). value is the exact
+optimum of the subproblem when exact is True, otherwise a proven lower bound on it.
+The cache holds at most max_bytes (estimated) and evicts the least recently used
+entries first.
+
+One cache can serve several solvers (a solver and those it spawns for kernels and
+components), so the budget covers them all. Their graphs are numbered differently,
+so each solver keys its entries with a space of its own from NewSpace().
+'''
+
+import sys
+from collections import OrderedDict
+
+# Estimated bytes per entry besides the key: the OrderedDict slot and the value tuple
+ENTRY_OVERHEAD = 150
+
+def KeySize(key): # Estimated bytes of a key: an int, or a tuple of ints
+    if isinstance(key, tuple):
+        return sys.getsizeof(key) + sum(map(sys.getsizeof, key))
+    return sys.getsizeof(key)
+
+class TranspositionCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0       # Estimated bytes used
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.spaces = 0     # Key spaces handed out by NewSpace
+
+    def NewSpace(self): # A key space for one more solver sharing the cache
+        self.spaces += 1
+        return self.spaces
+
+    def Get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry
+
+    def Put(self, key, value, exact):
+        old = self.entries.get(key)
+        if old is not None:
+            # Keep whichever says more: an exact value, or else the higher lower bound
+            if old[1] or (not exact and old[0] >= value):
+                self.entries.move_to_end(key)
+                return
+            self.entries[key] = (value, exact)
+            self.entries.move_to_end(key)
+            return
+        self.entries[key] = (value, exact)
+        self.size += KeySize(key) + ENTRY_OVERHEAD
+        while self.size > self.max_bytes and self.entries:
+            old_key, _ = self.entries.popitem(last=False)
+            self.size -= KeySize(old_key) + ENTRY_OVERHEAD
+            self.evictions += 1
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,35 @@
+'''
+Connected components, so the pieces of a disconnected graph can be solved one at a
+time. The optimum of the whole graph is the sum of the optima of its components,
+which costs a sum of exponentials instead of their product.
+'''
+
+def Components(graph, vertices=None):
+    '''
+    Connected components of graph (graph[v] is the set of neighbors of v), largest
+    first. vertices restricts the search to those vertices (default: all of them).
+    '''
+    if vertices is None:
+        vertices = graph if isinstance(graph, dict) else range(len(graph))
+    seen = set()
+    parts = []
+    for root in vertices:
+        if root in seen:
+            continue
+        seen.add(root)
+        part = [root]
+        for v in part:  # part grows while it is scanned, breadth first
+            for u in graph[v]:
+                if u not in seen:
+                    seen.add(u)
+                    part.append(u)
+        parts.append(part)
+    parts.sort(key=len, reverse=True)
+    return parts
+
+def Induced(graph, vertices):
+    '''
+    The subgraph on vertices, renumbered 0..len(vertices)-1 in the order given.
+    '''
+    index = {v: i for i, v in enumerate(vertices)}
+    return [{index[u] for u in graph[v] if u in index} for v in vertices]
@@ -0,0 +1,132 @@
+'''
+What main.Solver (toll stations, minimum vertex cover) and backup_power_solver.Solver
+(backup generators, minimum dominating set) have in common: recording incumbents,
+limits and proven bounds around Solve, and solving by connected components or by
+dynamic programming over a tree decomposition.
+
+A subclass provides the graph (graph[v] = the neighbors of v), NewState, RootBound,
+SolveOptimum, Spawn and DecompositionSolve, and names its best solution with a
+property over best_solution (best_stations, best_generators).
+'''
+
+from anytime import Incumbent, SearchInterrupted
+from components import Induced
+from treewidth import HEURISTICS, Decompose
+
+class BaseSolver:
+    def __init__(self, components, max_width, local_search, limits, on_incumbent, stats):
+        # Solve the connected components of the graph separately
+        self.components = components
+        # Graphs with a tree decomposition at most this wide are solved by DP over it (0 = never)
+        self.max_width = max_width
+        # Seconds of local search (see localsearch.py) improving the greedy solution before
+        # the exact search starts (0 = greedy only)
+        self.local_search = local_search
+        # anytime.Limits shared with every spawned solver: Solve stops when they run out (None = never)
+        self.limits = limits
+        # Called with an anytime.Incumbent for every improvement, as soon as it is found
+        self.on_incumbent = on_incumbent
+        # stats.SearchStats shared with every spawned solver, counting nodes, prunes and
+        # improvements and timing the node checks (None = no counting)
+        self.stats = stats
+        self.spawned = False  # Built by Spawn: best counts the solution of a derived graph, not this one
+        self.report = None  # Called with (count, solution) for every improvement: how sub-solvers pass theirs up
+        self.improvements = 0  # Times best was improved by this solver
+        self.lower_bound = 0  # Proven lower bound on the optimum
+        self.best = None  # Size of the best (minimum) solution found so far
+        self.best_solution = None  # Its vertices, None if only its size is known
+        self.shared_best = None  # Incumbent shared with other processes (see parallel.py)
+        self.share_work = None   # Called with the iterative engine's stack at every node (work stealing)
+
+    def ImproveTo(self, count, solution=None): # Record a solution of count vertices (None if unknown), count < best
+        self.best = count
+        self.best_solution = solution
+        self.improvements += 1
+        if self.stats is not None and not self.spawned:
+            self.stats.Improved(count)
+        if self.shared_best is not None:
+            with self.shared_best.get_lock():
+                if self.best < self.shared_best.value:
+                    self.shared_best.value = self.best
+        if self.report is not None:
+            self.report(count, solution)
+        if self.on_incumbent is not None:
+            self.on_incumbent(Incumbent(count, solution, self.lower_bound))
+
+    def Offer(self, solution): # Record solution, a collection of vertices solving the whole graph, if it beats best
+        if len(solution) < self.best:
+            self.ImproveTo(len(solution), list(solution))
+
+    def Pruned(self, reason): # Count a node cut off for reason (see stats.PRUNE_REASONS)
+        if self.stats is not None:
+            self.stats.Prune(reason)
+
+    def Sync(self): # Pick up a better incumbent found by another process
+        shared = self.shared_best.get_obj().value
+        if shared < self.best:
+            self.best = shared
+            self.best_solution = None
+
+    def Solve(self):
+        '''
+        Size of a minimum solution. If limits run out first, returns the best count found
+        so far and sets limits.stopped.
+        '''
+        self.lower_bound = max(self.lower_bound, self.RootBound())
+        try:
+            self.SolveOptimum()
+        except SearchInterrupted:
+            return self.best
+        if self.Exhaustive():
+            # Nothing below best exists (though best may be a cap set by the caller)
+            self.lower_bound = self.best
+        return self.best
+
+    def Exhaustive(self): # Did the search just finished rule out everything below best (the limits didn't stop it)?
+        return self.limits is None or not self.limits.stopped
+
+    def Unsolved(self, graph, part): # Does component part of graph need solving? (No for one that needs nothing)
+        return True
+
+    def SolveComponents(self, parts, graph=None, solution=()):
+        '''
+        Solve each connected component in parts (vertex lists of graph, default self.graph)
+        with its own solver and record solution plus their optima if that beats best.
+        Each component only gets the budget the others have left over, so a component that
+        can't fit in it ends the whole thing early.
+        '''
+        graph = self.graph if graph is None else graph
+        remaining = self.best - len(solution)
+        found = list(solution)
+        for part in parts:
+            if not self.Unsolved(graph, part):
+                continue
+            sub = self.Spawn(Induced(graph, part))
+            # The components of the whole graph share its local search time; components
+            # split off at search nodes get none
+            sub.local_search = self.local_search * len(part) / len(graph) if graph is self.graph else 0
+            sub.best = min(sub.best, remaining)
+            count = sub.Solve()
+            if count >= remaining:
+                return self.best
+            remaining -= count
+            if found is not None:
+                found = None if sub.best_solution is None else found + [part[v] for v in sub.best_solution]
+        self.ImproveTo(self.best - remaining, found)
+        return self.best
+
+    def SolveDecomposition(self):
+        '''
+        Solve by dynamic programming over a tree decomposition (see treewidth.py) if one of
+        the heuristics finds one at most max_width wide. Returns best, or None (having done
+        nothing) when the graph looks too wide.
+        '''
+        if not self.max_width:
+            return None
+        check = None if self.limits is None else self.limits.Check
+        for heuristic in HEURISTICS:
+            decomposition = Decompose(self.graph, heuristic, self.max_width, check)
+            if decomposition is not None:
+                self.DecompositionSolve(decomposition)
+                return self.best
+        return None
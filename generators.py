@@ -0,0 +1,88 @@
+'''
+Graph families for benchmarks and tests. Every generator returns graph[v] = set of
+neighbors of v for v = 0..N-1, the form both solvers' SetGraph accepts, and takes a
+seed where it is random so the same parameters always give the same graph.
+
+Named graphs (snarks, cages, ...) are read from the edge list files in the repo.
+'''
+
+import os
+import random
+from itertools import combinations
+
+from loader import LoadEdgeList
+
+# Named graphs shipped as edge lists next to this file
+NAMED = {
+    "petersen": "petersen.txt",
+    "heawood": "heawood.txt",
+    "loupekine_snark": "loupekine_snark.txt",
+    "complete5": "complete5.txt",
+    "complete20": "complete20.txt",
+    "input": "input.txt",
+}
+
+def FromEdges(num_vertices, edges):
+    graph = [set() for _ in range(num_vertices)]
+    for a, b in edges:
+        graph[a].add(b)
+        graph[b].add(a)
+    return graph
+
+def Gnp(n, p, seed=0):
+    # Erdos-Renyi G(n, p): every pair is connected independently with probability p
+    rng = random.Random(seed)
+    return FromEdges(n, [(a, b) for a, b in combinations(range(n), 2) if rng.random() < p])
+
+def RandomRegular(n, degree, seed=0, attempts=100):
+    '''
+    Random degree-regular graph by the pairing model: n * degree half-edges matched at
+    random, starting over when a loop or repeated edge comes up.
+    '''
+    if n * degree % 2 or degree >= n:
+        raise ValueError(f"no simple {degree}-regular graph on {n} vertices")
+    rng = random.Random(seed)
+    for _ in range(attempts):
+        ends = [v for v in range(n) for _ in range(degree)]
+        rng.shuffle(ends)
+        edges = {(min(a, b), max(a, b)) for a, b in zip(ends[0::2], ends[1::2])}
+        if len(edges) == n * degree // 2 and all(a != b for a, b in edges):
+            return FromEdges(n, edges)
+    raise ValueError(f"no {degree}-regular graph on {n} vertices found in {attempts} attempts")
+
+def Grid(rows, cols):
+    def Id(r, c):
+        return r * cols + c
+    edges = [(Id(r, c), Id(r, c + 1)) for r in range(rows) for c in range(cols - 1)]
+    edges += [(Id(r, c), Id(r + 1, c)) for r in range(rows - 1) for c in range(cols)]
+    return FromEdges(rows * cols, edges)
+
+def Complete(n):
+    return FromEdges(n, combinations(range(n), 2))
+
+def Named(name):
+    # One of the NAMED graphs, read from its edge list
+    graph = LoadEdgeList(os.path.join(os.path.dirname(os.path.abspath(__file__)), NAMED[name]))
+    return [set(graph[v]) for v in range(len(graph))]
+
+# Families by name, for specs like "gnp:60:0.1:3" (see Generate)
+FAMILIES = {
+    "gnp": (Gnp, (int, float, int)),
+    "regular": (RandomRegular, (int, int, int)),
+    "grid": (Grid, (int, int)),
+    "complete": (Complete, (int,)),
+    "named": (Named, (str,)),
+}
+
+def Generate(spec):
+    '''
+    The graph for a spec "family:arg:arg...", e.g. "gnp:60:0.1:3" (n, p, seed),
+    "regular:40:3:1" (n, degree, seed), "grid:5:8", "complete:12" or "named:petersen".
+    '''
+    family, *args = spec.split(":")
+    if family not in FAMILIES:
+        raise ValueError(f"unknown graph family {family!r}, expected one of {sorted(FAMILIES)}")
+    function, types = FAMILIES[family]
+    if len(args) > len(types):
+        raise ValueError(f"{family} takes at most {len(types)} parameters, got {spec!r}")
+    return function(*(kind(arg) for kind, arg in zip(types, args)))
@@ -0,0 +1,213 @@
+'''
+Vertex cover kernelization: safe reduction rules that shrink a graph before branching.
+
+Works on a copy of a graph given as {vertex_id: set of neighbor ids}. Each rule either
+takes vertices into the cover (forced), removes vertices that never need a station,
+or folds a degree-2 vertex into its neighbors. Lift() turns a cover of the reduced
+graph back into a cover of the original one.
+'''
+
+from collections import deque
+
+# Vertices reduced between calls to Reduce's check
+CHECK_EVERY = 1024
+
+class Kernel:
+    def __init__(self, graph, budget):
+        self.graph = {v: set(graph[v]) for v in (graph if isinstance(graph, dict) else range(len(graph)))}
+        self.budget = budget    # Only covers of at most this many vertices are of interest
+        self.forced = set()     # Vertices taken into the cover by the rules
+        self.folds = []         # (v, u, w) for every degree-2 fold, in the order they were made
+        self.infeasible = False # Set when the rules prove no cover within budget exists
+        self.check = None       # Called now and then while reducing, see Reduce
+
+    def Size(self):
+        # Stations already committed: forced vertices plus one for every fold
+        return len(self.forced) + len(self.folds)
+
+    def Remaining(self):
+        # Budget left for the reduced graph
+        return self.budget - self.Size()
+
+    def NumEdges(self):
+        return sum(len(adj) for adj in self.graph.values()) // 2
+
+    def Take(self, v, pending):
+        # Put v in the cover and delete it; its neighbors need re-checking
+        self.forced.add(v)
+        self.Delete(v, pending)
+
+    def Delete(self, v, pending):
+        for u in self.graph.pop(v):
+            if u != v:
+                self.graph[u].discard(v)
+                pending.add(u)
+        pending.discard(v)
+
+    def Fold(self, v, u, w, pending):
+        # Merge u and w into v. v keeps its id and gets every other neighbor of u and w.
+        merged = (self.graph[u] | self.graph[w]) - {u, v, w}
+        self.Delete(u, pending)
+        self.Delete(w, pending)
+        self.graph[v] = merged
+        for x in merged:
+            self.graph[x].add(v)
+            pending.add(x)
+        pending.add(v)
+        self.folds.append((v, u, w))
+
+    def Reduce(self, check=None):
+        '''
+        Apply every rule until none of them changes the graph. Returns False (and sets
+        infeasible) when no cover within the budget exists. check(), if given, is called
+        between rounds and every CHECK_EVERY vertices, and may raise to abandon the
+        reduction (such as anytime.Limits.Check once the limits run out).
+        '''
+        self.check = check
+        # A self-loop can only be covered by its own vertex
+        pending = set()
+        for v in [v for v in self.graph if v in self.graph[v]]:
+            self.Take(v, pending)
+        pending = set(self.graph)
+        while True:
+            if check is not None:
+                check()
+            self.ReduceLowDegree(pending)
+            if self.Remaining() < 0:
+                self.infeasible = True
+                return False
+            if self.ReduceHighDegree(pending):
+                continue
+            if self.infeasible:
+                return False
+            if self.ReduceCrown(pending):
+                continue
+            return True
+
+    def ReduceLowDegree(self, pending):
+        # Degree 0: never needs a station. Degree 1: take the neighbor.
+        # Degree 2: take both neighbors of a triangle, otherwise fold.
+        popped = 0
+        while pending:
+            popped += 1
+            if self.check is not None and popped % CHECK_EVERY == 0:
+                self.check()
+            v = pending.pop()
+            if v not in self.graph:
+                continue
+            degree = len(self.graph[v])
+            if degree == 0:
+                del self.graph[v]
+            elif degree == 1:
+                self.Take(next(iter(self.graph[v])), pending)
+            elif degree == 2:
+                u, w = self.graph[v]
+                if w in self.graph[u]:
+                    self.Take(u, pending)
+                    self.Take(w, pending)
+                else:
+                    self.Fold(v, u, w, pending)
+
+    def ReduceHighDegree(self, pending):
+        '''
+        Buss' rule: with k stations left, a vertex with more than k relays must take a
+        station (otherwise all of its neighbors would). Once every degree is at most k,
+        k stations cover at most k^2 relays, so a bigger graph has no cover within budget.
+        Returns True if any vertex was taken.
+        '''
+        remaining = self.Remaining()
+        high = [v for v in self.graph if len(self.graph[v]) > remaining]
+        if len(high) > remaining:
+            self.infeasible = True
+            return False
+        for v in high:
+            self.Take(v, pending)
+        if high:
+            return True
+        if self.NumEdges() > remaining * remaining:
+            self.infeasible = True
+        return False
+
+    def ReduceCrown(self, pending):
+        '''
+        Crown reduction. The vertices left unmatched by a maximal matching form an
+        independent set O. A maximum matching between O and its neighbors, grown from
+        the O vertices it leaves unmatched, gives a crown (I, H): every cover needs at
+        least |H| stations for the relays at I, and H itself covers them, so H is taken
+        and I is dropped. Returns True if a crown was found.
+        '''
+        matched = set()
+        for v in self.graph:
+            if v in matched:
+                continue
+            for u in self.graph[v]:
+                if u not in matched:
+                    matched.add(v)
+                    matched.add(u)
+                    break
+        outside = [v for v in self.graph if v not in matched and self.graph[v]]
+        if not outside:
+            return False
+
+        # Maximum matching between outside (left) and its neighbors (right) by augmenting paths
+        partner = {}  # right vertex -> left vertex and left vertex -> right vertex
+        for root in outside:
+            parent = {root: None}
+            queue = deque([root])
+            end = None
+            while queue and end is None:
+                left = queue.popleft()
+                for right in self.graph[left]:
+                    if right in parent:
+                        continue
+                    parent[right] = left
+                    if right not in partner:
+                        end = right
+                        break
+                    parent[partner[right]] = right
+                    queue.append(partner[right])
+            # Flip the matching along the augmenting path, if one was found
+            while end is not None:
+                left = parent[end]
+                next_end = partner.get(left)
+                partner[end] = left
+                partner[left] = end
+                end = next_end
+
+        crown = {v for v in outside if v not in partner}
+        if not crown:
+            return False
+        head = set()
+        while True:
+            new_head = set()
+            for v in crown:
+                new_head |= self.graph[v]
+            new_crown = crown | {partner[h] for h in new_head if h in partner}
+            head = new_head
+            if new_crown == crown:
+                break
+            crown = new_crown
+        # Every head vertex is matched into the crown, so taking the head is optimal
+        if any(h not in partner for h in head):
+            return False
+        for h in head:
+            self.Take(h, pending)
+        for v in crown:
+            if v in self.graph:
+                self.Delete(v, pending)
+        return True
+
+    def Lift(self, cover):
+        '''
+        Turn a cover of the reduced graph into a cover of the original graph.
+        '''
+        cover = set(cover) | self.forced
+        for v, u, w in reversed(self.folds):
+            # The merged vertex in the cover stands for u and w, otherwise v covers the fold
+            if v in cover:
+                cover.discard(v)
+                cover.add(u)
+                cover.add(w)
+            else:
+                cover.add(v)
+        return cover
@@ -0,0 +1,332 @@
+'''
+Local search for good covers fast, as upper bounds for branch and bound or as an
+anytime heuristic for graphs too big to solve exactly.
+
+VertexCoverSearch follows NuMVC: whenever the current set is a cover it is recorded
+and the vertex whose removal uncovers the least weight is dropped. Otherwise one
+vertex leaves and an endpoint of a random uncovered edge joins, and every edge
+left uncovered gets heavier, so edges that keep being missed get priority. Vertices
+whose neighborhood hasn't changed since they left may not come back
+(configuration checking), and weights are scaled down once their average grows
+too large. DominatingSetSearch does the same swaps with weights on buildings.
+
+Picking the vertex to remove from the best of a few random samples (BMS) instead of
+scanning the whole set keeps every step O(degree).
+'''
+
+import random
+import time
+
+# Vertices sampled when choosing one to remove
+SAMPLES = 50
+# Time is checked once every this many steps
+CHECK_EVERY = 256
+
+class VertexCoverSearch:
+    def __init__(self, graph, cover, seed=0):
+        '''
+        graph[v] is the set of neighbors of v; cover must be a vertex cover of it.
+        '''
+        vertices = list(graph if isinstance(graph, dict) else range(len(graph)))
+        self.random = random.Random(seed)
+        # A self-loop forces its vertex into every cover: keep those fixed, outside the search
+        self.fixed = {v for v in vertices if v in graph[v]}
+        self.edges = []            # (a, b) for every relay between two non-fixed vertices
+        self.incident = {v: [] for v in vertices}   # edge ids at each vertex
+        for a in vertices:
+            if a in self.fixed:
+                continue
+            for b in graph[a]:
+                if a < b and b not in self.fixed:
+                    self.incident[a].append(len(self.edges))
+                    self.incident[b].append(len(self.edges))
+                    self.edges.append((a, b))
+        self.weight = [1] * len(self.edges)
+        self.in_cover = {v: v in cover for v in vertices if v not in self.fixed}
+        # score[v]: weight uncovered by removing v if it is in the cover, else covered by adding it
+        self.score = dict.fromkeys(self.in_cover, 0)
+        self.allowed = dict.fromkeys(self.in_cover, True)  # Configuration checking
+        self.age = dict.fromkeys(self.in_cover, 0)         # Step v last moved
+        self.members = [v for v in self.in_cover if self.in_cover[v]]
+        self.position = {v: i for i, v in enumerate(self.members)}
+        self.uncovered = []        # Uncovered edge ids, with their positions for O(1) removal
+        self.uncovered_at = {}
+        for e, (a, b) in enumerate(self.edges):
+            if self.in_cover[a] != self.in_cover[b]:
+                self.score[a if self.in_cover[a] else b] -= 1
+            elif not self.in_cover[a]:
+                self.score[a] += 1
+                self.score[b] += 1
+                self.Uncover(e)
+        self.total_weight = len(self.edges)
+        self.threshold = max(50, len(self.in_cover) // 2)   # Average weight that triggers scaling
+
+    def Uncover(self, e):
+        self.uncovered_at[e] = len(self.uncovered)
+        self.uncovered.append(e)
+
+    def Cover(self, e):
+        i = self.uncovered_at.pop(e)
+        last = self.uncovered.pop()
+        if last != e:
+            self.uncovered[i] = last
+            self.uncovered_at[last] = i
+
+    def Add(self, v):
+        self.in_cover[v] = True
+        self.position[v] = len(self.members)
+        self.members.append(v)
+        self.score[v] = -self.score[v]
+        for e in self.incident[v]:
+            a, b = self.edges[e]
+            u = b if a == v else a
+            if self.in_cover[u]:
+                self.score[u] += self.weight[e]   # No longer covered by u alone
+            else:
+                self.score[u] -= self.weight[e]
+                self.Cover(e)
+                self.allowed[u] = True
+
+    def Remove(self, v):
+        self.in_cover[v] = False
+        i = self.position.pop(v)
+        last = self.members.pop()
+        if last != v:
+            self.members[i] = last
+            self.position[last] = i
+        self.score[v] = -self.score[v]
+        self.allowed[v] = False
+        for e in self.incident[v]:
+            a, b = self.edges[e]
+            u = b if a == v else a
+            if self.in_cover[u]:
+                self.score[u] -= self.weight[e]   # Now covered by u alone
+            else:
+                self.score[u] += self.weight[e]
+                self.Uncover(e)
+                self.allowed[u] = True
+
+    def Cheapest(self, exclude=None):
+        # Cover vertex (from SAMPLES random ones) whose removal uncovers the least weight
+        best = None
+        for _ in range(min(SAMPLES, len(self.members))):
+            v = self.members[self.random.randrange(len(self.members))]
+            if v == exclude:
+                continue
+            if best is None or (-self.score[v], self.age[v]) < (-self.score[best], self.age[best]):
+                best = v
+        return best
+
+    def Current(self): # The vertices in the cover now: a whole cover while nothing is uncovered
+        return self.fixed | set(self.members)
+
+    def Run(self, seconds=None, steps=None, on_improve=None, target=None, stop=None):
+        '''
+        Search until seconds have passed or steps swaps were made (at least one limit is
+        needed), or until a cover of at most target (such as a lower bound) is found, or
+        until stop() (checked as often as the clock, e.g. anytime.Limits.Expired) is true.
+        on_improve(size) is called for every smaller cover found, which Current() holds
+        during the call. Returns the smallest cover found.
+        '''
+        if seconds is None and steps is None:
+            raise ValueError("local search needs a time or step limit")
+        deadline = None if seconds is None else time.perf_counter() + seconds
+        best = self.Current()
+        step = 0
+        added = None
+        while True:
+            if not self.uncovered:
+                if len(self.members) + len(self.fixed) < len(best):
+                    best = self.Current()
+                    if on_improve is not None:
+                        on_improve(len(best))
+                if not self.members or (target is not None and len(best) <= target):
+                    break
+                self.Remove(self.Cheapest())
+                continue
+            step += 1
+            if steps is not None and step > steps:
+                break
+            if deadline is not None and step % CHECK_EVERY == 0 and time.perf_counter() > deadline:
+                break
+            if stop is not None and step % CHECK_EVERY == 0 and stop():
+                break
+            # Swap: drop the cheapest vertex (but not the one just added), add the
+            # better allowed end of a random uncovered edge
+            u = self.Cheapest(exclude=added)
+            if u is not None:   # None when the set is empty or holds only the vertex just added
+                self.Remove(u)
+                self.age[u] = step
+            a, b = self.edges[self.uncovered[self.random.randrange(len(self.uncovered))]]
+            if not self.allowed[a]:
+                added = b
+            elif not self.allowed[b]:
+                added = a
+            else:
+                added = a if (-self.score[a], self.age[a]) < (-self.score[b], self.age[b]) else b
+            self.Add(added)
+            self.age[added] = step
+            # Every edge still uncovered gets heavier
+            for e in self.uncovered:
+                self.weight[e] += 1
+                a, b = self.edges[e]
+                self.score[a] += 1
+                self.score[b] += 1
+            self.total_weight += len(self.uncovered)
+            if self.total_weight > self.threshold * len(self.edges):
+                self.Forget()
+        return best
+
+    def Forget(self):
+        # Scale every weight down to 30%, keeping each at least 1, and rebuild the scores
+        for e in range(len(self.edges)):
+            self.weight[e] = max(1, self.weight[e] * 3 // 10)
+        self.total_weight = sum(self.weight)
+        for v in self.score:
+            self.score[v] = 0
+        for e, (a, b) in enumerate(self.edges):
+            if self.in_cover[a] and not self.in_cover[b]:
+                self.score[a] -= self.weight[e]
+            elif self.in_cover[b] and not self.in_cover[a]:
+                self.score[b] -= self.weight[e]
+            elif not self.in_cover[a]:
+                self.score[a] += self.weight[e]
+                self.score[b] += self.weight[e]
+
+class DominatingSetSearch:
+    def __init__(self, graph, dominating, seed=0):
+        '''
+        graph[v] is the set of neighbors of v; dominating must dominate every vertex.
+        '''
+        n = len(graph)
+        self.random = random.Random(seed)
+        self.closed = [set(graph[v]) | {v} for v in range(n)]
+        self.in_set = [False] * n
+        self.count = [0] * n       # Members of the set in closed[u]
+        self.weight = [1] * n
+        self.score = [0] * n       # Weight undominated by removing v / dominated by adding v
+        self.allowed = [True] * n
+        self.age = [0] * n
+        self.members = []
+        self.position = {}
+        self.undominated = list(range(n))
+        self.undominated_at = {u: u for u in range(n)}
+        for v in range(n):
+            self.score[v] = len(self.closed[v])
+        for v in set(dominating):
+            self.Add(v)
+
+    def Undominate(self, u):
+        self.undominated_at[u] = len(self.undominated)
+        self.undominated.append(u)
+
+    def Dominate(self, u):
+        i = self.undominated_at.pop(u)
+        last = self.undominated.pop()
+        if last != u:
+            self.undominated[i] = last
+            self.undominated_at[last] = i
+
+    def Add(self, v):
+        self.in_set[v] = True
+        self.position[v] = len(self.members)
+        self.members.append(v)
+        for u in self.closed[v]:
+            self.count[u] += 1
+            if self.count[u] == 1:
+                # u is dominated now, so adding any other dominator of it gains nothing for u
+                self.Dominate(u)
+                for w in self.closed[u]:
+                    if w != v:
+                        self.score[w] -= self.weight[u]
+                        self.allowed[w] = True
+            elif self.count[u] == 2:
+                # The other member dominating u no longer loses it on removal
+                for w in self.closed[u]:
+                    if w != v and self.in_set[w]:
+                        self.score[w] += self.weight[u]
+        self.score[v] = -sum(self.weight[u] for u in self.closed[v] if self.count[u] == 1)
+
+    def Remove(self, v):
+        self.in_set[v] = False
+        i = self.position.pop(v)
+        last = self.members.pop()
+        if last != v:
+            self.members[i] = last
+            self.position[last] = i
+        self.allowed[v] = False
+        for u in self.closed[v]:
+            self.count[u] -= 1
+            if self.count[u] == 0:
+                self.Undominate(u)
+                for w in self.closed[u]:
+                    if w != v:
+                        self.score[w] += self.weight[u]
+                        self.allowed[w] = True
+            elif self.count[u] == 1:
+                for w in self.closed[u]:
+                    if self.in_set[w]:
+                        self.score[w] -= self.weight[u]
+        self.score[v] = sum(self.weight[u] for u in self.closed[v] if self.count[u] == 0)
+
+    def Cheapest(self, exclude=None):
+        # Member (from SAMPLES random ones) whose removal undominates the least weight
+        best = None
+        for _ in range(min(SAMPLES, len(self.members))):
+            v = self.members[self.random.randrange(len(self.members))]
+            if v == exclude:
+                continue
+            if best is None or (-self.score[v], self.age[v]) < (-self.score[best], self.age[best]):
+                best = v
+        return best
+
+    def Current(self): # The members now: a dominating set while nothing is undominated
+        return set(self.members)
+
+    def Run(self, seconds=None, steps=None, on_improve=None, target=None, stop=None):
+        '''
+        Search until seconds have passed or steps swaps were made (at least one limit is
+        needed), until a dominating set of at most target is found, or until stop() is
+        true, as for VertexCoverSearch. on_improve(size) is called for every smaller
+        dominating set found, which Current() holds during the call. Returns the smallest
+        one found.
+        '''
+        if seconds is None and steps is None:
+            raise ValueError("local search needs a time or step limit")
+        deadline = None if seconds is None else time.perf_counter() + seconds
+        best = self.Current()
+        step = 0
+        added = None
+        while True:
+            if not self.undominated:
+                if len(self.members) < len(best):
+                    best = self.Current()
+                    if on_improve is not None:
+                        on_improve(len(best))
+                if not self.members or (target is not None and len(best) <= target):
+                    break
+                self.Remove(self.Cheapest())
+                continue
+            step += 1
+            if steps is not None and step > steps:
+                break
+            if deadline is not None and step % CHECK_EVERY == 0 and time.perf_counter() > deadline:
+                break
+            if stop is not None and step % CHECK_EVERY == 0 and stop():
+                break
+            u = self.Cheapest(exclude=added)
+            if u is not None:   # None when the set is empty or holds only the vertex just added
+                self.Remove(u)
+                self.age[u] = step
+            # Add the best allowed dominator of a random undominated building
+            x = self.undominated[self.random.randrange(len(self.undominated))]
+            candidates = [w for w in self.closed[x] if self.allowed[w]] or list(self.closed[x])
+            added = min(candidates, key=lambda w: (-self.score[w], self.age[w]))
+            self.Add(added)
+            self.age[added] = step
+            # Every building still undominated gets heavier
+            for y in self.undominated:
+                self.weight[y] += 1
+                for w in self.closed[y]:
+                    self.score[w] += 1
+        return best
@@ -1,58 +1,354 @@
-import cProfile
+import copy
+import sys
+
+from buckets import Pick
+from cache import TranspositionCache
+from components import Components
+from core import BaseSolver
+from kernel import Kernel
+from treewidth import MinVertexCover
+from loader import CSRGraph, LoadGraph
+from localsearch import VertexCoverSearch
 
 '''
 For profiling original solution with only required tasks completed
 '''
 
+# Frame actions for the explicit stack in Solver.BranchIterative
+FRAME_EXPAND = 0   # Evaluate the node for the current state and push its cases: value is its depth
+FRAME_UNDO = 1     # Pop the trail back to a saved length
+FRAME_RESTORE = 2  # Reset next_id once both cases of a node are done
+FRAME_EXCLUDE = 3  # Start an exclude case: value is (open relays, trail length, next_id, depth) at its node
+FRAME_STORE = 4    # A node is done: value is (cache key, stations, improvements) for Store
+
 class ProblemState:
     def __init__(
         self,
         next_id = 0, # The next system index to consider in branching (e.g., include or exclude it).
-        include_set = set() # A set containing the system IDs where toll stations have been placed so far.
+        include_set = set(), # A set containing the system IDs where toll stations have been placed so far.
+        uncovered = 0 # Number of hyper relays with no toll station on either end.
     ):
         self.next_id = next_id
         self.include_set = include_set
+        self.uncovered = uncovered
+
+class BitsetProblemState:
+    def __init__(
+        self,
+        next_id = 0, # The next system index to consider in branching (e.g., include or exclude it).
+        include_mask = 0, # Bit i is set when system i has a toll station.
+        uncovered = 0 # Number of hyper relays with no toll station on either end.
+    ):
+        self.next_id = next_id
+        self.include_mask = include_mask
+        self.uncovered = uncovered
+
+class DegreeBuckets:
+    '''
+    Residual degree (relays to systems without a station) of every system without a
+    station, kept in buckets by degree so the highest-degree and degree-1 systems are
+    found without a scan. Include/Remove update it in O(degree). open_mask has bit v
+    set while v has no station and at least one uncovered relay.
+    '''
+    def __init__(self, graph, has_station):
+        self.graph = graph
+        self.has_station = list(has_station)
+        self.degree = [0] * len(self.has_station)
+        self.buckets = [set() for _ in range(max((len(graph[v]) for v in range(len(self.has_station))), default=0) + 1)]
+        self.max_degree = 0
+        self.open_mask = 0
+        for v in range(len(self.has_station)):
+            if not self.has_station[v]:
+                self.degree[v] = sum(1 for u in graph[v] if not self.has_station[u])
+                self.buckets[self.degree[v]].add(v)
+                self.max_degree = max(self.max_degree, self.degree[v])
+                if self.degree[v]:
+                    self.open_mask |= 1 << v
 
-class Solver:
-    def __init__(self):
+    def Move(self, v, degree):
+        if not degree or not self.degree[v]:
+            self.open_mask ^= 1 << v
+        self.buckets[self.degree[v]].discard(v)
+        self.buckets[degree].add(v)
+        self.degree[v] = degree
+
+    def Include(self, v): # v gets a station: it leaves the buckets and its neighbors lose a relay
+        self.has_station[v] = True
+        self.buckets[self.degree[v]].discard(v)
+        if self.degree[v]:
+            self.open_mask ^= 1 << v
+        for u in self.graph[v]:
+            if not self.has_station[u]:
+                self.Move(u, self.degree[u] - 1)
+
+    def Remove(self, v): # Undoes Include
+        self.has_station[v] = False
+        degree = 0
+        for u in self.graph[v]:
+            if not self.has_station[u]:
+                degree += 1
+                if u != v:
+                    self.Move(u, self.degree[u] + 1)
+                    self.max_degree = max(self.max_degree, self.degree[u])
+        self.degree[v] = degree
+        self.buckets[degree].add(v)
+        self.max_degree = max(self.max_degree, degree)
+        if degree:
+            self.open_mask ^= 1 << v
+
+    def Highest(self): # Largest residual degree (max_degree only ever overestimates)
+        while self.max_degree > 0 and not self.buckets[self.max_degree]:
+            self.max_degree -= 1
+        return self.max_degree
+
+    def Any(self, degree): # Some system with the given residual degree (the bucket must not be empty)
+        v, self.buckets[degree] = Pick(self.buckets[degree])
+        return v
+
+    def Above(self, degree): # Systems with residual degree greater than the given one
+        return [v for d in range(degree + 1, self.Highest() + 1) for v in self.buckets[d]]
+
+class Solver(BaseSolver):
+    problem = "vertex_cover"
+
+    def __init__(self, graph = None, engine = "iterative", bounds = (), preprocess = "kernel", branching = "order",
+                 components = True, cache = 0, max_width = 8, local_search = 0, limits = None,
+                 on_incumbent = None, stats = None, first = "include", cloning = "clone"):
+        if branching not in BRANCHING:
+            raise ValueError(f"unknown branching policy {branching!r}, expected one of {sorted(BRANCHING)}")
+        if branching != "order" and engine == "clone":
+            raise ValueError(f"branching policy {branching!r} needs an in-place engine (undo or iterative)")
+        if cache and engine == "clone":
+            raise ValueError("the transposition cache needs an in-place engine (undo or iterative)")
+        if preprocess not in PREPROCESSORS:
+            raise ValueError(f"unknown preprocessing {preprocess!r}, expected one of {sorted(PREPROCESSORS)}")
+        if engine not in ENGINES:
+            raise ValueError(f"unknown search engine {engine!r}, expected one of {sorted(ENGINES)}")
+        if first not in FIRST:
+            raise ValueError(f"unknown first case {first!r}, expected one of {FIRST}")
+        if first != "include" and engine == "iterative":
+            raise ValueError("exclude-first branching needs the clone or undo engine")
+        if cloning not in CLONING:
+            raise ValueError(f"unknown cloning {cloning!r}, expected one of {CLONING}")
+        for name in bounds:
+            if name not in LOWER_BOUNDS:
+                raise ValueError(f"unknown lower bound {name!r}, expected one of {sorted(LOWER_BOUNDS)}")
+        super().__init__(components, max_width, local_search, limits, on_incumbent, stats)
+        self.engine = engine  # "clone" copies the state per branch, "undo"/"iterative" mutate one state in place
+        self.first = first    # Which case of a branch is searched first: "include" or "exclude" the system
+        # How the clone engine copies states: "clone" copies the fields, "deepcopy" uses
+        # copy.deepcopy (much slower, kept to compare against)
+        self.cloning = cloning
+        if cloning == "deepcopy":
+            self.clone = copy.deepcopy
+        # Lower bounds on the stations still needed, checked at every node (empty = count-only bounding)
+        self.bounds = tuple(bounds)
+        self.lower_bounds = [getattr(self, LOWER_BOUNDS[name]) for name in bounds]
+        # "kernel" reduces the graph before searching and again at every in-place search node
+        self.preprocess = preprocess
+        self.node_reductions = preprocess == "kernel"
+        # How the in-place engines pick the system to branch on. Excluding it always places
+        # stations on its open relays, so the cases are "v" and "all of N(v)".
+        self.branching = branching
+        self.select = getattr(self, BRANCHING[branching])
+        # Components are also split apart at in-place search nodes where reductions have just placed stations
+        # Megabytes for the transposition cache of the in-place engines (0 = no cache),
+        # shared with every spawned solver
+        self.cache_mb = cache
+        self.cache = None
+        self.cache_space = 0  # This solver's key space in the cache (see cache.py)
+        if stats is not None:
+            self.TestValid = stats.Timed(self.TestValid)
+            self.LowerBound = stats.Timed(self.LowerBound)
+        self.trail = []       # Systems included by the in-place engine, in inclusion order
+        self.degrees = None   # DegreeBuckets for node reductions and degree branching
         self.N = 0          # Number of star systems (nodes)
         self.M = 0          # Number of connections (edges)
         self.graph = None   # Will store graph as adjacency list
-        self.best = None    # Best (minimum) toll station count found so far
-        self.Load()
+        self.num_relays = 0 # Number of distinct hyper relays (duplicate edges collapse in the sets)
+        self.base_stations = []  # Stations of the state the in-place search started from
+        self.kernel = None  # Kernel of the last SolveKernel
+        if graph is None:
+            self.Load()
+        else:
+            self.SetGraph(graph)
+
+    def Options(self):
+        # Constructor options, to build an equivalent solver for another graph or process
+        # (not on_incumbent: spawned solvers and parallel workers pass improvements up through report)
+        return dict(engine=self.engine, bounds=self.bounds, preprocess=self.preprocess, branching=self.branching,
+                    components=self.components, cache=self.cache_mb, max_width=self.max_width,
+                    local_search=self.local_search, limits=self.limits, stats=self.stats, first=self.first,
+                    cloning=self.cloning)
+
+    def Spawn(self, graph):
+        # A solver with the same representation and options for a derived graph (e.g. the kernel).
+        # It uses this solver's cache rather than one of its own, so --cache bounds the whole solve.
+        sub = type(self)(graph, **dict(self.Options(), cache=0))
+        sub.spawned = True
+        sub.cache_mb = self.cache_mb
+        if self.cache is not None:
+            sub.cache = self.cache
+            sub.cache_space = self.cache.NewSpace()
+        return sub
+
+    def Improve(self, state): # Record a valid state with fewer stations than best
+        self.ImproveTo(self.CountStations(state), self.Stations(state))
+
+    @property
+    def best_stations(self): # Stations of the best cover, None if only its size is known
+        return self.best_solution
+
+    @best_stations.setter
+    def best_stations(self, stations):
+        self.best_solution = stations
 
     def clone(self, state):
         # Create new instance with copied values -- more efficient than deepcopy
-        return ProblemState(state.next_id, set(state.include_set))
+        return ProblemState(state.next_id, set(state.include_set), state.uncovered)
 
-    def Load(self):
-        self.N, self.M = map(int, input().split(" ")) # Read verts and edges
-        self.graph = {vertex_id: set() for vertex_id in range(self.N)} # Initializes an adjacency list for all star systems.
-        
-        for _ in range(self.M): # Fills the graph: each relay (edge) is undirected, so you add it to both nodes’ sets.
-            a, b = map(int, input().split(" "))
-            # Add edge between a <---> b
-            self.graph[a].add(b)
-            self.graph[b].add(a)
+    def NewState(self, stations=()):
+        # Build a state with every relay uncovered, then place the given stations so the counter is correct.
+        state = ProblemState(0, set(), self.num_relays)
+        for system_id in stations:
+            self.IncludeSystem(state, system_id)
+        return state
+
+    def Load(self, source=None): # Read a text or binary graph file, or text from stdin when source is None
+        # Bulk read into a CSR adjacency (see loader.py) instead of one input() per relay.
+        # The search needs the sets, so keep the ones built while loading.
+        self.SetGraph(LoadGraph(source, keep_sets=True))
+
+    def SetGraph(self, graph): # graph[i] is the set of systems sharing a hyper relay with system i
+        self.N = len(graph)
+        if isinstance(graph, CSRGraph):
+            # Loaded graphs are only read, so the CSR's cached sets can be shared
+            self.graph = graph.Sets()
+            self.num_relays = graph.NumEdges()
+        else:
+            self.graph = {vertex_id: set(graph[vertex_id]) for vertex_id in range(self.N)}
+            # Count each undirected relay once (a self-loop counts once as well)
+            self.num_relays = sum(1 for a in range(self.N) for b in self.graph[a] if b >= a)
+        self.M = self.num_relays
         # Update best to a "worst-case" scenario:
         # We know we *could* solve the problem by building a toll station in every
         # star system, so initialize best to N
         self.best = self.N
+        self.best_stations = list(range(self.N))
+        # Cached results are about subgraphs of this graph only
+        self.cache = TranspositionCache(self.cache_mb << 20) if self.cache_mb else None
+        self.cache_space = 0 if self.cache is None else self.cache.NewSpace()
+
+    def HasStation(self, state: ProblemState, system_id: int):
+        return system_id in state.include_set
+
+    def Stations(self, state): # Systems with a station in state
+        return [system_id for system_id in range(self.N) if self.HasStation(state, system_id)]
+
+    def CountStations(self, state: ProblemState):
+        return len(state.include_set)
 
     def TestValid(self, state: ProblemState):
-        for system_id in range(self.N):
-            # If system has a station, all of its hyper relays have a toll station.
-            if system_id in state.include_set:
-                continue
-            # Otherwise, we need to check that all hyper relays connected to this system have a toll station on the other end.
-            for conn_id in self.graph[system_id]:
-                if not conn_id in state.include_set:
-                    return False
-        return True
+        # IncludeSystem/RemoveSystem keep the uncovered relay count up to date, so this is O(1)
+        return state.uncovered == 0
 
     def IncludeSystem(self, state: ProblemState, system_id: int): # Adds a toll station to the given system in the state.
+        if system_id in state.include_set:
+            return
+        # Every relay to a system without a station was uncovered until now
+        for conn_id in self.graph[system_id]:
+            if conn_id not in state.include_set:
+                state.uncovered -= 1
         state.include_set.add(system_id)
+
+    def RemoveSystem(self, state: ProblemState, system_id: int): # Undoes IncludeSystem when backtracking.
+        if system_id not in state.include_set:
+            return
+        state.include_set.remove(system_id)
+        # Relays whose other end has no station become uncovered again
+        for conn_id in self.graph[system_id]:
+            if conn_id not in state.include_set:
+                state.uncovered += 1
     
+    def LowerBound(self, state):
+        # Best (largest) of the configured bounds on how many more stations are needed
+        bound = 0
+        for lower_bound in self.lower_bounds:
+            bound = max(bound, lower_bound(state))
+        return bound
+
+    def MatchingBound(self, state):
+        '''
+        Greedy maximal matching on the uncovered relays. Matched relays share no
+        systems, so each one needs a station of its own.
+        '''
+        if state.uncovered == 0:
+            return 0
+        matched = set()
+        bound = 0
+        for a in range(self.N):
+            if a in matched or self.HasStation(state, a):
+                continue
+            for b in self.graph[a]:
+                if b not in matched and not self.HasStation(state, b):
+                    # A self-loop (b == a) can only be covered by a itself
+                    matched.add(a)
+                    matched.add(b)
+                    bound += 1
+                    break
+        return bound
+
+    def CliqueCoverBound(self, state):
+        '''
+        Greedily split the systems without a station into disjoint cliques of the
+        uncovered relays. A clique of size k needs at least k - 1 stations.
+        '''
+        if state.uncovered == 0:
+            return 0
+        assigned = set()
+        bound = 0
+        for a in range(self.N):
+            if a in assigned or self.HasStation(state, a):
+                continue
+            clique = [a]
+            assigned.add(a)
+            for b in self.graph[a]:
+                if b in assigned or self.HasStation(state, b):
+                    continue
+                if all(c in self.graph[b] for c in clique):
+                    clique.append(b)
+                    assigned.add(b)
+            bound += len(clique) - 1
+        return bound
+
+    def GreedyCover(self):
+        # Keep placing a station at the system with the most uncovered relays. Always a
+        # valid cover, so its size is a safe first incumbent.
+        degrees = DegreeBuckets(self.graph, [False] * self.N)
+        cover = set()
+        while degrees.Highest() > 0:
+            # pop() for good, as the station takes it out of the buckets anyway (see Any)
+            system_id = degrees.buckets[degrees.max_degree].pop()
+            degrees.Include(system_id)
+            cover.add(system_id)
+        return cover
+
+    def HeuristicCover(self):
+        '''
+        The greedy cover, improved by local_search seconds of local search. Stops early
+        if it reaches the matching bound, since nothing smaller exists.
+        '''
+        cover = self.GreedyCover()
+        if self.local_search:
+            target = self.MatchingBound(self.NewState())
+            seconds = self.local_search
+            if self.limits is not None and self.limits.deadline is not None:
+                seconds = min(seconds, self.limits.Remaining())
+            if len(cover) > target:
+                stop = None if self.limits is None else self.limits.Expired
+                cover = VertexCoverSearch(self.graph, cover).Run(seconds=seconds, target=target, stop=stop)
+        return cover
+
     def GreedyPreprocess(self):
         mustHaveStations = set()
         
@@ -89,22 +385,176 @@ class Solver:
         return mustHaveStations
          
     # Entry point to running the solver
-    def Solve(self):
-        # Greedy Preprocess to find must-have stations
-        mustHaveStations = self.GreedyPreprocess()
+    def Solve(self, k=None):
+        '''
+        Minimum number of toll stations. Given k, only decide whether k stations are
+        enough instead and return True or False (see Decide). If limits run out first,
+        returns the best count found so far and sets limits.stopped.
+        '''
+        if k is not None:
+            return self.Decide(k)
+        return super().Solve()
+
+    def RootBound(self): # Proven lower bound before searching
+        return self.MatchingBound(self.NewState())
+
+    def Exhaustive(self): # Not after greedy preprocessing either, which may force stations in
+        return super().Exhaustive() and self.preprocess != "greedy"
+
+    def SolveOptimum(self): # Solve's search for the optimum, without limit handling
+        if self.components:
+            parts = Components(self.graph)
+            if len(parts) > 1:
+                return self.SolveComponents(parts)
+
+        if self.preprocess == "kernel":
+            return self.SolveKernel()
+
+        if self.SolveDecomposition() is not None:
+            return self.best
+
+        if self.local_search:
+            self.Offer(self.HeuristicCover())
+            if self.limits is not None:
+                self.limits.Check()
+
+        # Greedy Preprocess to find must-have stations (a heuristic: it may place stations
+        # an optimal answer wouldn't use)
+        mustHaveStations = self.GreedyPreprocess() if self.preprocess == "greedy" else set()
 
         # Build initial problem state.
-        initial_state = ProblemState(0, set(mustHaveStations))
-        
+        return self.Search(self.NewState(mustHaveStations))
+
+    def Decide(self, k):
+        '''
+        Is there a cover with at most k stations? Searches with best = k + 1, so the kernel
+        gets budget k from the start (high-degree rule, edge count check) and only covers
+        of at most k are ever explored. The in-place engines branch on the highest degree
+        system: excluding it places a station on each of its neighbors. best is left at the
+        cover found, or as it was if there is none. Greedy preprocessing is skipped, since
+        its stations could rule out every cover of k.
+        '''
+        if k < 0:
+            return False
+        if self.best <= k:
+            return True
+        if self.lower_bound > k:
+            return False
+        saved_best, saved_branching, saved_preprocess = self.best, self.branching, self.preprocess
+        if self.engine != "clone":
+            self.branching, self.select = "max_degree", self.SelectMaxDegree
+        if self.preprocess == "greedy":
+            self.preprocess = "none"
+        try:
+            self.best = k + 1
+            found = self.Solve() <= k
+        finally:
+            self.branching, self.select = saved_branching, getattr(self, BRANCHING[saved_branching])
+            self.preprocess = saved_preprocess
+        if not found:
+            self.best = saved_best
+        return found
+
+    def SolveDeepening(self):
+        '''
+        Minimum number of toll stations by asking Decide for k = lower bound, lower bound + 1,
+        ... until the answer is yes. Each failed k costs about as much as one bounded search,
+        so this wins when the optimum is small compared to the graph.
+        '''
+        k = self.MatchingBound(self.NewState())
+        while not self.Decide(k):
+            if self.limits is not None and self.limits.stopped:
+                break
+            k += 1
+        return self.best
+
+    def SolveKernel(self):
+        '''
+        Shrink the graph with the reductions in kernel.py and search only what is left.
+        The greedy cover is the first incumbent and sets the budget for the high-degree rule.
+        '''
+        sub = self.KernelSolver()
+        if sub is None:
+            return self.best
+        parts = Components(sub.graph) if self.components else []
+        if len(parts) > 1:
+            sub.SolveComponents(parts)
+        elif sub.SolveDecomposition() is None:
+            sub.Search(sub.NewState())
+        return self.best
+
+    def Unsolved(self, graph, part): # A lone system without a self-loop has no relays, so needs no station
+        return len(part) > 1 or part[0] in graph[part[0]]
+
+    def DecompositionSolve(self, decomposition): # SolveDecomposition's DP, recording the cover it finds
+        cover = set()
+        MinVertexCover(self.graph, decomposition, cover)
+        self.Offer(cover)
+
+    def SolveApart(self, state):
+        '''
+        If the systems with uncovered relays form more than one connected component, solve
+        the components separately (see SolveComponents) instead of branching at this node.
+        Returns False, doing nothing, when they are still connected.
+        '''
+        # The degree buckets above 0 hold exactly the systems with uncovered relays
+        residual = {system_id: self.OpenRelays(state, system_id) for system_id in self.degrees.Above(0)}
+        parts = Components(residual)
+        if len(parts) < 2:
+            return False
+        self.SolveComponents(parts, residual, self.Stations(state))
+        return True
+
+    def KernelSolver(self):
+        '''
+        Set best to a greedy (or local search) cover, reduce the graph into self.kernel and
+        return a solver for the kernel (renumbered 0..n-1) whose best is what the kernel
+        must beat, and whose improvements are lifted into improvements of best. Returns
+        None when the reductions prove the greedy cover is optimal, or leave nothing to search.
+        '''
+        self.Offer(self.HeuristicCover())
+        if self.limits is not None:
+            self.limits.Check()
+        self.kernel = Kernel(self.graph, self.best - 1)
+        if not self.kernel.Reduce(None if self.limits is None else self.limits.Check):
+            return None
+        if not self.kernel.graph:
+            self.Offer(self.kernel.Lift(()))
+            return None
+        labels = sorted(self.kernel.graph)
+        index = {v: i for i, v in enumerate(labels)}
+        sub = self.Spawn([{index[u] for u in self.kernel.graph[v]} for v in labels])
+        sub.best = min(sub.best, self.best - self.kernel.Size())
+        sub.local_search = 0  # Already done on the whole graph
+
+        def Report(count, stations):
+            if self.kernel.Size() + count < self.best:
+                lifted = None if stations is None else self.kernel.Lift(labels[v] for v in stations)
+                self.ImproveTo(self.kernel.Size() + count, lifted)
+
+        sub.report = Report
+        return sub
+
+    def Search(self, initial_state):
         # If already found a solution, return it.
         if self.TestValid(initial_state):
-            self.best = len(initial_state.include_set)
+            if self.CountStations(initial_state) < self.best:
+                self.Improve(initial_state)
             return self.best
         
         cur_system = initial_state.next_id
         
+        # The in-place engines handle already-included systems themselves
+        if self.engine in ("undo", "iterative"):
+            self.StartInPlace(initial_state)
+            if self.engine == "undo":
+                self.BranchUndo(initial_state)
+            else:
+                self.BranchIterative(initial_state)
+            return self.best
+
         # Skip over systems that are already in the include set
-        while cur_system < self.N and cur_system in initial_state.include_set:
+        while cur_system < self.N and self.HasStation(initial_state, cur_system):
             initial_state.next_id += 1
             cur_system = initial_state.next_id
         
@@ -112,74 +562,510 @@ class Solver:
         if cur_system >= self.N:
             return self.best
 
-        # Try excluding the current system under consideration
-        exc_state = self.clone(initial_state)
-        exc_state.next_id += 1
-        self.IncludeSystem(exc_state, cur_system)
-        self.Branch(exc_state)
-
-        # Try including the current system under consideration
-        initial_state.next_id += 1
-        self.Branch(initial_state)
-
+        # Try including and excluding the current system under consideration
+        self.BranchCases(initial_state, cur_system, 1)
         return self.best
     
-    def Branch(self, state: ProblemState):
+    def Branch(self, state: ProblemState, depth=0):
         # Current count of systems with stations
-        num_stations = len(state.include_set)
+        num_stations = self.CountStations(state)
         
         # BOUNDING: prune if already worse than current best
         #If the number of toll stations in the current branch is already greater than or equal to
         # the best solution found so far, we stop exploring this branch.
         # This avoids wasting time on worse solutions and helps reduce the exponential search space.
+        if self.shared_best is not None:
+            self.Sync()
+        if self.limits is not None:
+            self.limits.Tick()
+        if self.stats is not None:
+            self.stats.Node(depth)
         if num_stations >= self.best:
+            self.Pruned("bound")
             return self.best
         # Is this a valid solution?
         valid_sol = self.TestValid(state)
         # If so, if better than best, update best and bail out of this branch.
         if (valid_sol and num_stations < self.best):
-            self.best = num_stations
+            self.Improve(state)
+            return self.best
+        # Prune if the relays still uncovered force too many extra stations
+        if num_stations + self.LowerBound(state) >= self.best:
+            self.Pruned("lower_bound")
             return self.best
         # Not a solution. If next_id is not valid, return.
         if (state.next_id >= self.N):
+            self.Pruned("infeasible")
             return self.best
         # If we're here, next_id is valid and we don't yet have a solution on this branch.
         cur_system = state.next_id
 
 
 # (Back Tracking)
-        # Try including the current system under consideration *
-        
-        # We now recursively branch into two cases:
-        # Case 1: Include the current system (place a toll station here)
-        exc_state = self.clone(state)                # Make a deep copy so changes don't affect other branches
-        self.IncludeSystem(exc_state, cur_system)       # Add the system to the toll station set
-        exc_state.next_id += 1                          # Move to the next system
-        best_exc = self.Branch(exc_state)                          # Recursively explore with this inclusion
-
-        # Try excluding the current system under consideration *
-        
-        # Try excluding the current system under consideration (Polynomial time optimization)  #FIXME add comments
-        state.next_id += 1
-        best_inc = self.Branch(state)   
+        # We now recursively branch into two cases: include the current system (place
+        # a toll station here) or exclude it
+        return self.BranchCases(state, cur_system, depth + 1)
+
+    def BranchCases(self, state, cur_system, depth):
+        # Both cases for cur_system, the first one on a copy so changes don't affect the other
+        if self.first == "include":
+            inc_state = self.clone(state)
+            self.IncludeSystem(inc_state, cur_system)   # Add the system to the toll station set
+            inc_state.next_id += 1                      # Move to the next system
+            best_inc = self.Branch(inc_state, depth)
+            state.next_id += 1
+            best_exc = self.Branch(state, depth)
+        else:
+            exc_state = self.clone(state)
+            exc_state.next_id += 1
+            best_exc = self.Branch(exc_state, depth)
+            self.IncludeSystem(state, cur_system)
+            state.next_id += 1
+            best_inc = self.Branch(state, depth)
         return min(best_inc, best_exc)
 
+    def StartInPlace(self, state): # Fresh trail and degree buckets for an in-place search from state
+        self.trail = []
+        self.base_stations = [v for v in range(self.N) if self.HasStation(state, v)]
+        self.degrees = None
+        if self.node_reductions or self.branching != "order" or self.cache is not None:
+            self.degrees = DegreeBuckets(self.graph, [self.HasStation(state, v) for v in range(self.N)])
+
+    def Donate(self, stack):
+        '''
+        Take the shallowest exclude case still waiting on BranchIterative's stack off the
+        stack and return it as a (stations, next_id) subproblem for another worker.
+        Returns None when there is nothing left to give away.
+        '''
+        for i, (action, value) in enumerate(stack):
+            if action == FRAME_EXCLUDE:
+                open_relays, mark, next_id, _ = value
+                del stack[i]
+                # The nodes below it lose part of their subtree, so their results can't be cached
+                stack[:i] = [frame for frame in stack[:i] if frame[0] != FRAME_STORE]
+                return (self.base_stations + self.trail[:mark] + open_relays, next_id)
+        return None
+
+    def Split(self, state, depth):
+        '''
+        Expand the top depth levels of the search from state with the in-place cases and
+        return the open nodes below them as (stations, next_id) pairs. Together the
+        parts cover every solution under state that could beat best.
+        '''
+        self.StartInPlace(state)
+        parts = []
+        self.SplitNode(state, depth, self.base_stations, parts)
+        return parts
+
+    def SplitNode(self, state, depth, stations, parts):
+        num_stations = self.CountStations(state)
+        if num_stations >= self.best:
+            return
+        if self.TestValid(state):
+            self.Improve(state)
+            return
+        if num_stations + self.LowerBound(state) >= self.best:
+            return
+        mark = len(self.trail)
+        next_id = state.next_id
+        if self.node_reductions:
+            if not self.ReduceNode(state):
+                self.UndoTo(state, mark)
+                return
+            if len(self.trail) > mark:
+                self.SplitNode(state, depth, stations, parts)
+                self.UndoTo(state, mark)
+                return
+        cur_system = self.select(state) if depth > 0 else None
+        if cur_system is None:
+            # Leaf of the split: hand the node to a worker
+            parts.append((stations + self.trail, state.next_id))
+        else:
+            open_relays = [] if self.HasStation(state, cur_system) else self.OpenRelays(state, cur_system)
+            if not open_relays:
+                self.SplitNode(state, depth, stations, parts)
+            else:
+                self.Push(state, cur_system)
+                self.SplitNode(state, depth - 1, stations, parts)
+                self.UndoTo(state, mark)
+                if cur_system not in open_relays:
+                    for conn_id in open_relays:
+                        self.Push(state, conn_id)
+                    self.SplitNode(state, depth - 1, stations, parts)
+                    self.UndoTo(state, mark)
+        state.next_id = next_id
+        self.UndoTo(state, mark)
+
+    def Push(self, state, system_id: int): # Include a system and remember it on the trail so it can be undone.
+        if self.HasStation(state, system_id):
+            return
+        self.IncludeSystem(state, system_id)
+        self.trail.append(system_id)
+        if self.degrees is not None:
+            self.degrees.Include(system_id)
+
+    def UndoTo(self, state, mark: int): # Pop the trail back to a saved length, removing those stations again.
+        while len(self.trail) > mark:
+            system_id = self.trail.pop()
+            self.RemoveSystem(state, system_id)
+            if self.degrees is not None:
+                self.degrees.Remove(system_id)
+
+    def OpenRelays(self, state, system_id: int): # Systems on the other end of system_id's uncovered relays
+        return [conn_id for conn_id in self.graph[system_id] if not self.HasStation(state, conn_id)]
+
+    def SelectInOrder(self, state):
+        # Branch on systems in input order. Systems before next_id are decided.
+        if state.next_id >= self.N:
+            return None
+        state.next_id += 1
+        return state.next_id - 1
+
+    def SelectMaxDegree(self, state):
+        # Branch on a system with the most uncovered relays, straight from the degree buckets
+        if self.degrees.Highest() == 0:
+            return None
+        return self.degrees.Any(self.degrees.max_degree)
+
+    def ReduceNode(self, state):
+        '''
+        Cheap reductions at an in-place search node, read off self.degrees. A system with
+        one uncovered relay leaves the station to the other end, and with k stations left
+        any system with more than k uncovered relays must take one. Stations placed here
+        go on the trail. Returns False if the node can no longer beat best.
+        '''
+        while True:
+            budget = self.best - 1 - self.CountStations(state)
+            if budget < 0:
+                return False
+            if self.degrees.buckets[1]:
+                leaf = self.degrees.Any(1)
+                self.Push(state, self.OpenRelays(state, leaf)[0])
+                continue
+            high = self.degrees.Above(budget)
+            if len(high) > budget:
+                return False
+            if high:
+                for system_id in high:
+                    self.Push(state, system_id)
+                continue
+            # budget stations cover at most budget * (highest degree) relays
+            return state.uncovered <= budget * self.degrees.Highest()
+
+    def LookUp(self, key, num_stations):
+        '''
+        Transposition cache check for a node with num_stations stations whose systems with
+        uncovered relays are the bits of key. Returns True if a cached result settles the
+        node: it can't beat best, or its exact optimum gives a better cover right away.
+        '''
+        entry = self.cache.Get((self.cache_space, key))
+        if entry is None:
+            return False
+        value, exact = entry
+        if num_stations + value >= self.best:
+            return True
+        if exact:
+            self.ImproveTo(num_stations + value)
+            return True
+        return False
+
+    def Store(self, key, num_stations, improvements):
+        '''
+        Cache what searching a node proved: no cover of its residual graph has fewer than
+        best - num_stations stations. If this solver improved best in the meantime (and no
+        other process could have), that is the residual graph's exact optimum.
+        '''
+        exact = self.improvements != improvements and self.shared_best is None
+        self.cache.Put((self.cache_space, key), self.best - num_stations, exact)
+
+    def BranchUndo(self, state, depth=0):
+        '''
+        In-place version of Branch. Both cases are explored on the one shared state:
+        the include case pushes onto self.trail and is undone before the exclude case,
+        so no state is ever copied and memory stays O(N) for the whole search.
+        '''
+        num_stations = self.CountStations(state)
+        if self.shared_best is not None:
+            self.Sync()
+        if self.limits is not None:
+            self.limits.Tick()
+        if self.stats is not None:
+            self.stats.Node(depth)
+        if num_stations >= self.best:
+            self.Pruned("bound")
+            return self.best
+        if self.TestValid(state):
+            self.Improve(state)
+            return self.best
+        if num_stations + self.LowerBound(state) >= self.best:
+            self.Pruned("lower_bound")
+            return self.best
+
+        if self.cache is not None:
+            key = self.degrees.open_mask
+            if self.LookUp(key, num_stations):
+                self.Pruned("cache")
+                return self.best
+            improvements = self.improvements
+            self.ExpandUndo(state, depth)
+            self.Store(key, num_stations, improvements)
+            return self.best
+        return self.ExpandUndo(state, depth)
+
+    def ExpandUndo(self, state, depth): # The rest of BranchUndo: reductions and the two cases
+        # Node reductions: re-evaluate the node with the forced stations, then undo them
+        mark = len(self.trail)
+        if self.node_reductions:
+            if not self.ReduceNode(state):
+                self.Pruned("infeasible")
+                self.UndoTo(state, mark)
+                return self.best
+            if len(self.trail) > mark:
+                if not (self.components and self.SolveApart(state)):
+                    self.BranchUndo(state, depth + 1)
+                self.UndoTo(state, mark)
+                return self.best
+
+        next_id = state.next_id
+        cur_system = self.select(state)
+        if cur_system is None:
+            return self.best
+        open_relays = [] if self.HasStation(state, cur_system) else self.OpenRelays(state, cur_system)
+
+        if not open_relays:
+            # Already has a station, or nothing left to cover: only one way to go
+            self.BranchUndo(state, depth + 1)
+        else:
+            # Case 1: Include the current system. Case 2: Exclude the current system. It is
+            # never revisited, so every system on its uncovered relays must take a station
+            # (impossible with a self-loop).
+            cases = [[cur_system]]
+            if cur_system not in open_relays:
+                cases.append(open_relays)
+            if self.first == "exclude":
+                cases.reverse()
+            for stations in cases:
+                for system_id in stations:
+                    self.Push(state, system_id)
+                self.BranchUndo(state, depth + 1)
+                self.UndoTo(state, mark)
+
+        # Leave next_id as we found it for the caller
+        state.next_id = next_id
+        return self.best
+
+    def BranchIterative(self, state):
+        '''
+        BranchUndo driven by an explicit stack of (action, value) frames instead of recursion.
+        Explores the same nodes in the same order, but is not limited by Python's recursion
+        limit and does not pay for a Python call per decision.
+        '''
+        stack = [(FRAME_EXPAND, 0)]
+        while stack:
+            action, value = stack.pop()
+            if action == FRAME_UNDO:
+                self.UndoTo(state, value)
+                continue
+            if action == FRAME_RESTORE:
+                state.next_id = value
+                continue
+            if action == FRAME_STORE:
+                self.Store(*value)
+                continue
+            if action == FRAME_EXCLUDE:
+                stack.append((FRAME_UNDO, len(self.trail)))
+                for conn_id in value[0]:
+                    self.Push(state, conn_id)
+                stack.append((FRAME_EXPAND, value[3]))
+                continue
+
+            depth = value
+            num_stations = self.CountStations(state)
+            if self.shared_best is not None:
+                self.Sync()
+            if self.limits is not None:
+                self.limits.Tick()
+            if self.stats is not None:
+                self.stats.Node(depth)
+            if self.share_work is not None:
+                self.share_work(stack)
+            if num_stations >= self.best:
+                self.Pruned("bound")
+                continue
+            if self.TestValid(state):
+                self.Improve(state)
+                continue
+            if num_stations + self.LowerBound(state) >= self.best:
+                self.Pruned("lower_bound")
+                continue
+            if self.cache is not None:
+                key = self.degrees.open_mask
+                if self.LookUp(key, num_stations):
+                    self.Pruned("cache")
+                    continue
+                stack.append((FRAME_STORE, (key, num_stations, self.improvements)))
+
+            mark = len(self.trail)
+            if self.node_reductions:
+                if not self.ReduceNode(state):
+                    self.Pruned("infeasible")
+                    self.UndoTo(state, mark)
+                    continue
+                if len(self.trail) > mark:
+                    stack.append((FRAME_UNDO, mark))
+                    if not (self.components and self.SolveApart(state)):
+                        stack.append((FRAME_EXPAND, depth + 1))
+                    continue
+
+            next_id = state.next_id
+            cur_system = self.select(state)
+            if cur_system is None:
+                continue
+            open_relays = [] if self.HasStation(state, cur_system) else self.OpenRelays(state, cur_system)
+
+            # Frames run last-in first-out: include case, undo it, exclude case, undo it, restore next_id
+            stack.append((FRAME_RESTORE, next_id))
+            if not open_relays:
+                stack.append((FRAME_EXPAND, depth + 1))
+                continue
+            if cur_system not in open_relays:
+                stack.append((FRAME_EXCLUDE, (open_relays, mark, state.next_id, depth + 1)))
+            stack.append((FRAME_UNDO, mark))
+            self.Push(state, cur_system)
+            stack.append((FRAME_EXPAND, depth + 1))
+        return self.best
+
+class BitsetSolver(Solver):
+    '''
+    Same search as Solver, but the include set is a single int used as a bitmask.
+    Cloning copies one int, and covering a system's relays is a mask and a popcount.
+    '''
+    def SetGraph(self, graph):
+        super().SetGraph(graph)
+        # neighbor_masks[i] has bit j set when systems i and j share a hyper relay
+        self.neighbor_masks = [0] * self.N
+        for system_id in range(self.N):
+            for conn_id in self.graph[system_id]:
+                self.neighbor_masks[system_id] |= 1 << conn_id
+
+    def clone(self, state):
+        return BitsetProblemState(state.next_id, state.include_mask, state.uncovered)
+
+    def NewState(self, stations=()):
+        state = BitsetProblemState(0, 0, self.num_relays)
+        for system_id in stations:
+            self.IncludeSystem(state, system_id)
+        return state
+
+    def HasStation(self, state: BitsetProblemState, system_id: int):
+        return (state.include_mask >> system_id) & 1 == 1
+
+    def CountStations(self, state: BitsetProblemState):
+        return state.include_mask.bit_count()
+
+    def IncludeSystem(self, state: BitsetProblemState, system_id: int):
+        bit = 1 << system_id
+        if state.include_mask & bit:
+            return
+        # Relays to neighbors without a station were uncovered until now
+        state.uncovered -= (self.neighbor_masks[system_id] & ~state.include_mask).bit_count()
+        state.include_mask |= bit
+
+    def RemoveSystem(self, state: BitsetProblemState, system_id: int):
+        bit = 1 << system_id
+        if not state.include_mask & bit:
+            return
+        state.include_mask &= ~bit
+        state.uncovered += (self.neighbor_masks[system_id] & ~state.include_mask).bit_count()
+
+    def MatchingBound(self, state: BitsetProblemState):
+        if state.uncovered == 0:
+            return 0
+        free = ((1 << self.N) - 1) & ~state.include_mask
+        bound = 0
+        remaining = free
+        while remaining:
+            bit = remaining & -remaining
+            a = bit.bit_length() - 1
+            remaining ^= bit
+            if not free & bit:
+                continue
+            partners = self.neighbor_masks[a] & free
+            if partners:
+                # Matching a with its lowest free neighbor (or itself, for a self-loop)
+                partner = partners & -partners
+                free &= ~(bit | partner)
+                bound += 1
+        return bound
+
+    def CliqueCoverBound(self, state: BitsetProblemState):
+        if state.uncovered == 0:
+            return 0
+        free = ((1 << self.N) - 1) & ~state.include_mask
+        bound = 0
+        while free:
+            bit = free & -free
+            a = bit.bit_length() - 1
+            free ^= bit
+            clique = bit
+            candidates = self.neighbor_masks[a] & free
+            while candidates:
+                b_bit = candidates & -candidates
+                b = b_bit.bit_length() - 1
+                candidates ^= b_bit
+                if self.neighbor_masks[b] & clique == clique:
+                    clique |= b_bit
+                    free ^= b_bit
+            bound += clique.bit_count() - 1
+        return bound
+
+# Available search engines, selectable with --engine
+ENGINES = ("clone", "undo", "iterative")
+
+# Which case of each branch to search first, selectable with --first
+FIRST = ("include", "exclude")
+
+# How the clone engine copies states, selectable with --cloning
+CLONING = ("clone", "deepcopy")
+
+# Available preprocessing, selectable with --preprocess
+PREPROCESSORS = ("kernel", "greedy", "none")
+
+# Available branching policies (name -> Solver method), selectable with --branching
+BRANCHING = {
+    "order": "SelectInOrder",
+    "max_degree": "SelectMaxDegree",
+}
+
+# Available lower bounds (name -> Solver method), selectable with --bound
+LOWER_BOUNDS = {
+    "matching": "MatchingBound",
+    "clique": "CliqueCoverBound",
+}
+
+# Available problem state representations, selectable with --state
+SOLVERS = {
+    "set": Solver,
+    "bitset": BitsetSolver,
+}
 
 if __name__ == "__main__":
-    
-    # Python's cProfile module to analyze where time is being spent in the program.
-    profiler = cProfile.Profile()
-    profiler.enable()
-    
-    solver = Solver()
-    result = solver.Solve()
-    print(result)
-    
-    profiler.disable()
-    profiler.dump_stats("main.prof")  # Save stats for SnakeViz
-    
+    # Same command line as "python3 solve.py vertex-cover"
+    from solve import Main
+    Main(["vertex-cover"] + sys.argv[1:], profile="main.prof")
+
 # python3 main.py < input.txt
-# snakeviz main.prof
+# python3 main.py --state bitset < input.txt
+# python3 main.py --state bitset --engine undo < input.txt
+# python3 main.py --engine iterative < input.txt
+# python3 main.py --engine iterative --bound matching --bound clique < complete20.txt
+# python3 main.py --engine iterative --branching max_degree < loupekine_snark.txt
+# python3 main.py --engine iterative --workers 8 --schedule stealing < input.txt
+# python3 main.py --heuristic --local-search 10 < big.txt
+# python3 main.py --time-limit 60 --progress < big.txt
+# python3 main.py --engine iterative --stats < input.txt
+# python3 loader.py complete20.txt complete20.csr && python3 main.py --graph complete20.csr
+# python3 main.py --profile < input.txt && snakeviz main.prof
 
 # Required tasks:
 # Added backtracking
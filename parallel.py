@@ -0,0 +1,332 @@
+'''
+Parallel branch and bound for main.Solver (toll stations) and
+backup_power_solver.Solver (backup generators).
+
+The top levels of the search tree are expanded in the parent process and every
+open node left below them becomes a subproblem for a process pool. The best
+count found so far lives in shared memory: workers prune against it at every
+node and lower it as soon as they improve on it, so each worker benefits from
+the others' solutions. Each improvement also goes to the parent through a queue,
+and the parent records it as the sequential solver would, so on_incumbent hears
+about it (with its stations) while the workers are still searching.
+The answer is the same optimum the sequential solver finds.
+The solver's anytime.Limits go to every worker: each stops at the same deadline, but
+counts its own nodes against the node limit.
+
+With schedule="stealing" only a few levels are expanded up front. Each worker
+keeps its iterative engine's frame stack as its own deque, working on the deepest
+frame, and whenever some worker sits idle it gives away the shallowest exclude
+case still waiting on its stack (the biggest piece of work it has) through a
+shared task queue. Subproblems are only written out when they are donated.
+
+A disconnected graph (after kernelization, for toll stations) is instead solved
+one connected component per task, each sequentially, and the optima are summed.
+
+With local_search, one more process runs local search (see localsearch.py) next
+to the workers and lowers the shared best whenever it finds a smaller solution,
+so the workers prune harder while they search. It sends its solutions to the parent too.
+'''
+
+import math
+import multiprocessing
+import queue
+
+from anytime import SearchInterrupted
+from components import Components, Induced
+from localsearch import DominatingSetSearch, VertexCoverSearch
+
+# Per-process state for pool workers, set up once by InitWorker
+worker = {}
+
+# Nodes a stealing worker expands between checks for idle workers
+STEAL_INTERVAL = 64
+
+SCHEDULES = ("static", "stealing")
+
+# Seconds the parent waits for its workers between passing on their improvements
+POLL_INTERVAL = 0.05
+
+def InitWorker(solver_class, graph, options, shared_best, stopped, improvements):
+    solver = solver_class(graph, **options)
+    solver.shared_best = shared_best
+    solver.report = ReportImprovement
+    worker["solver"] = solver
+    worker["shared_best"] = shared_best
+    worker["stopped"] = stopped  # Set when a worker's limits ran out
+    worker["improvements"] = improvements
+
+def ReportImprovement(count, stations):
+    # report hook of worker solvers: send the improvement to the parent (see ParallelSolver.PassOn)
+    worker["improvements"].put((count, stations))
+
+def SearchPart(state):
+    # Search state in this worker, flagging stopped if the limits run out first
+    solver = worker["solver"]
+    try:
+        return solver.Search(state)
+    except SearchInterrupted:
+        worker["stopped"].value = 1
+        return solver.best
+
+def SolveTollPart(part):
+    # part: (stations, next_id) from main.Solver.Split
+    solver = worker["solver"]
+    solver.best = worker["shared_best"].value
+    stations, next_id = part
+    state = solver.NewState(stations)
+    state.next_id = next_id
+    return SearchPart(state)
+
+def SolveComponent(task):
+    # task: (solver class, component graph, options, cap); returns min(cap, optimum), a
+    # solution of that size if one below cap was found (else None), and whether the limits
+    # stopped the search first
+    solver_class, graph, options, cap = task
+    solver = solver_class(graph, **options)
+    solver.best = min(solver.best, cap)
+    count = solver.Solve()
+    solution = solver.best_solution
+    return count, solution if count < cap else None, solver.limits is not None and solver.limits.stopped
+
+def ShareWork(stack):
+    # share_work hook: every STEAL_INTERVAL nodes, give a waiting subtree to an idle worker
+    worker["nodes"] += 1
+    if worker["nodes"] % STEAL_INTERVAL or worker["idle"].value == 0:
+        return
+    part = worker["solver"].Donate(stack)
+    if part is not None:
+        with worker["pending"].get_lock():
+            worker["pending"].value += 1
+        worker["tasks"].put(part)
+
+def StealWorker(solver_class, graph, options, shared_best, stopped, improvements, tasks, pending, idle, solve_part):
+    # Worker process for schedule="stealing": solve tasks until every task is done
+    InitWorker(solver_class, graph, options, shared_best, stopped, improvements)
+    worker.update(tasks=tasks, pending=pending, idle=idle, nodes=0)
+    worker["solver"].share_work = ShareWork
+    with idle.get_lock():
+        idle.value += 1
+    while True:
+        try:
+            part = tasks.get(timeout=0.01)
+        except queue.Empty:
+            if pending.value == 0:
+                return
+            continue
+        with idle.get_lock():
+            idle.value -= 1
+        try:
+            solve_part(part)
+        finally:
+            # Even if part failed, so the other workers don't wait for it forever
+            with pending.get_lock():
+                pending.value -= 1
+        with idle.get_lock():
+            idle.value += 1
+
+def LocalSearchWorker(problem, graph, start, seconds, shared_best, improvements):
+    # Process running local search from start, lowering shared_best with every improvement
+    # and sending it to the parent
+    search_class = VertexCoverSearch if problem == "vertex_cover" else DominatingSetSearch
+    search = search_class(graph, start)
+
+    def Share(size):
+        with shared_best.get_lock():
+            if size >= shared_best.value:
+                return
+            shared_best.value = size
+        improvements.put((size, sorted(search.Current())))
+
+    search.Run(seconds=seconds, on_improve=Share)
+
+def SolveGeneratorPart(part):
+    # part: (included, excluded) from backup_power_solver.Solver.Split
+    solver = worker["solver"]
+    solver.best = worker["shared_best"].value
+    included, excluded = part
+    state = solver.NewState()
+    for v in included:
+        solver.IncludeVertex(state, v)
+    for v in excluded:
+        solver.ExcludeVertex(state, v)
+    return SearchPart(state)
+
+class ParallelSolver:
+    def __init__(self, solver, workers=None, depth=None, schedule="static", local_search=0):
+        '''
+        solver: a loaded main.Solver or backup_power_solver.Solver (any state class).
+        workers: pool size (default: every CPU). depth: tree levels expanded up front
+            (default: enough for about 8 subproblems per worker, or 1 per worker when stealing).
+        schedule: "static" hands the up-front subproblems to a pool, "stealing" lets
+            workers split their subtrees further while running (needs engine="iterative").
+        local_search: seconds of local search to run next to the workers (0 = none).
+        '''
+        if schedule not in SCHEDULES:
+            raise ValueError(f"unknown schedule {schedule!r}, expected one of {SCHEDULES}")
+        if schedule == "stealing" and solver.engine != "iterative":
+            raise ValueError("work stealing needs the iterative engine")
+        self.solver = solver
+        self.workers = workers or multiprocessing.cpu_count()
+        self.schedule = schedule
+        self.local_search = local_search
+        per_worker = 1 if schedule == "stealing" else 8
+        self.depth = depth if depth is not None else max(1, math.ceil(math.log2(self.workers * per_worker)))
+
+    def Solve(self):
+        solver = self.solver
+        if solver.problem not in ("vertex_cover", "dominating_set"):
+            raise ValueError(f"can't run {solver.problem!r} problems in parallel")
+        try:
+            solver.lower_bound = max(solver.lower_bound, solver.RootBound())
+            if solver.problem == "vertex_cover":
+                self.SolveTolls()
+            else:
+                self.SolveGenerators()
+        except SearchInterrupted:
+            return solver.best  # The limits ran out before the workers started
+        if solver.Exhaustive():
+            solver.lower_bound = solver.best
+        return solver.best
+
+    def SolveTolls(self):
+        solver = self.solver
+        # Same preprocessing as Solver.Solve; the search object is the kernel solver if any
+        if solver.preprocess == "kernel":
+            search = solver.KernelSolver()
+            if search is None:
+                return solver.best
+            offset = solver.kernel.Size()
+            state = search.NewState()
+        else:
+            search = solver
+            offset = 0
+            if solver.local_search:
+                solver.Offer(solver.HeuristicCover())
+            state = solver.NewState(solver.GreedyPreprocess() if solver.preprocess == "greedy" else ())
+
+        graph = [search.graph[v] for v in range(search.N)]
+        components = Components(graph) if search.components else []
+        if len(components) > 1:
+            best = self.RunComponents(search, graph, components)
+        else:
+            parts = search.Split(state, self.depth)
+            best = self.Run(search, graph, parts, SolveTollPart)
+        if best < search.best:
+            # Only a count reached shared_best (say local search stopped before sending
+            # its solution); a kernel solver passes this on to solver
+            search.ImproveTo(best)
+        return solver.best
+
+    def SolveGenerators(self):
+        solver = self.solver
+        state = solver.NewState()
+        solver.Offer(solver.HeuristicSet())
+        components = Components(solver.graph_adj) if solver.components else []
+        if len(components) > 1:
+            best = self.RunComponents(solver, solver.graph_adj, components)
+        else:
+            parts = solver.Split(state, self.depth)
+            best = self.Run(solver, solver.graph_adj, parts, SolveGeneratorPart)
+        if best < solver.best:
+            solver.ImproveTo(best)
+        return solver.best
+
+    def RunComponents(self, search, graph, components):
+        # Components are independent: one pool task each, biggest first. A component can
+        # only need all of best if the total can't beat it, so best caps each of them.
+        tasks = [(type(search), Induced(graph, part), search.Options(), search.best) for part in components]
+        with multiprocessing.Pool(self.workers) as pool:
+            results = list(pool.imap(SolveComponent, tasks, chunksize=1))
+        if any(stopped for _, _, stopped in results):
+            search.limits.stopped = True
+        total = sum(count for count, _, _ in results)
+        if total < search.best:
+            # Every count is below the cap then, so each component found a solution unless it only got a count
+            solutions = [solution for _, solution, _ in results]
+            if any(solution is None for solution in solutions):
+                search.ImproveTo(total)
+            else:
+                search.ImproveTo(total, sorted(part[v] for part, solution in zip(components, solutions) for v in solution))
+        return search.best
+
+    def Run(self, search, graph, parts, solve_part):
+        # Solve every part on the pool and return the best count overall
+        if not parts:
+            return search.best
+        shared_best = multiprocessing.Value("i", search.best)
+        stopped = multiprocessing.Value("b", 0)
+        # (count, stations) for every improvement; SimpleQueue writes before put returns, so
+        # whatever a worker sent is there by the time its result is
+        improvements = multiprocessing.SimpleQueue()
+        helper = self.StartLocalSearch(search, graph, shared_best, improvements)
+        try:
+            if self.schedule == "stealing":
+                return self.RunStealing(search, graph, parts, solve_part, shared_best, stopped, improvements)
+            initargs = (type(search), graph, search.Options(), shared_best, stopped, improvements)
+            with multiprocessing.Pool(self.workers, initializer=InitWorker, initargs=initargs) as pool:
+                results = pool.map_async(solve_part, parts, chunksize=1)
+                while not results.ready():
+                    results.wait(POLL_INTERVAL)
+                    self.PassOn(search, improvements)
+                results = results.get()
+            self.PassOn(search, improvements)
+            return min([search.best, shared_best.value] + results)
+        finally:
+            # The search is exhaustive, so once it is done local search can't help anymore
+            if helper is not None:
+                helper.terminate()
+                helper.join()
+            if stopped.value:
+                search.limits.stopped = True
+
+    def PassOn(self, search, improvements):
+        # Record the improvements sent since the last call in search, which reports them
+        # (on_incumbent, or through a kernel solver) like its own
+        while not improvements.empty():
+            count, stations = improvements.get()
+            if count < search.best:
+                search.ImproveTo(count, stations)
+
+    def StartLocalSearch(self, search, graph, shared_best, improvements):
+        # Start the local search process from the greedy solution, or return None without local_search
+        if not self.local_search:
+            return None
+        if search.problem == "vertex_cover":
+            start = search.GreedyCover()
+        else:
+            start = list(search.Members(search.Greedy(search.NewState()).included))
+        helper = multiprocessing.Process(target=LocalSearchWorker,
+                                         args=(search.problem, graph, start, self.local_search, shared_best, improvements))
+        helper.start()
+        return helper
+
+    def RunStealing(self, search, graph, parts, solve_part, shared_best, stopped, improvements):
+        # Workers improve shared_best directly, so it holds the answer once they are done
+        tasks = multiprocessing.Queue()
+        pending = multiprocessing.Value("i", len(parts))
+        idle = multiprocessing.Value("i", 0)
+        for part in parts:
+            tasks.put(part)
+        args = (type(search), graph, search.Options(), shared_best, stopped, improvements, tasks, pending, idle, solve_part)
+        processes = [multiprocessing.Process(target=StealWorker, args=args) for _ in range(self.workers)]
+        for process in processes:
+            process.start()
+        try:
+            while True:
+                # exitcode is None while a worker runs; a killed worker never finishes its
+                # task, so the others would wait for it forever
+                exitcodes = [process.exitcode for process in processes]
+                failed = [code for code in exitcodes if code]
+                if failed:
+                    raise RuntimeError(f"a work-stealing worker exited with code {failed[0]}")
+                if None not in exitcodes:
+                    break
+                processes[exitcodes.index(None)].join(POLL_INTERVAL)
+                self.PassOn(search, improvements)
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+        self.PassOn(search, improvements)
+        return min(search.best, shared_best.value)
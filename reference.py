@@ -0,0 +1,40 @@
+'''
+Shared by the tests: reference answers from the plain branch search (no kernel, tree
+decomposition or component splitting), checks that a solution is valid, and the random
+graphs the differential tests run on.
+'''
+
+from generators import Gnp
+from solve import SolveGraph
+
+# Solver options leaving only branching, by problem; the dominating set solver has no kernel
+PLAIN = {
+    "vc": dict(engine="iterative", preprocess="none", max_width=0, components=False),
+    "ds": dict(engine="iterative", max_width=0, components=False),
+}
+
+def Plain(problem, graph): # SolveGraph's answer for problem ("vc" or "ds") by the plain branch search
+    return SolveGraph(problem, graph, **PLAIN[problem])
+
+def Optimum(problem, graph):
+    return Plain(problem, graph)["result"]
+
+def IsCover(graph, cover):
+    return all(a in cover or b in cover for a in range(len(graph)) for b in graph[a])
+
+def IsDominating(graph, dominating):
+    return all(v in dominating or graph[v] & dominating for v in range(len(graph)))
+
+def WithLoops(graph, vertices): # A copy of graph with a self-loop on each of vertices
+    graph = [set(neighbors) for neighbors in graph]
+    for v in vertices:
+        graph[v].add(v)
+    return graph
+
+def RandomGraphs(sizes, densities, seeds):
+    # (name, graph[v] = set of neighbors) for a G(n, p) graph of every size, density and seed
+    return [(f"gnp:{n}:{p}:{seed}", Gnp(n, p, seed)) for n in sizes for p in densities for seed in seeds]
+
+def Cases(graphs, variants):
+    # (name, graph, variant) for every graph with every variant
+    return [(name, graph, variant) for name, graph in graphs for variant in variants]
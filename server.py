@@ -0,0 +1,283 @@
+'''
+Solve server: a warm pool of solver processes behind a local socket, so other services
+can have graphs solved without starting an interpreter (and importing the solvers)
+for every request. Requests wait in a queue, each may have a deadline, and a client
+can cancel any of its requests, queued or running.
+
+python3 server.py --socket /tmp/solver.sock --workers 4
+python3 server.py --port 8765 --queue 1000
+
+The protocol is JSON lines both ways, over a Unix socket or a TCP port on 127.0.0.1
+only. A solve request is
+
+{"id": 7, "problem": "vc", "edges": [[0, 1], [1, 2]], "vertices": 3,
+ "state": "set", "options": {"engine": "iterative"}, "deadline": 2.5}
+
+with the graph as "edges" (plus "vertices" when some have no edges) or as "graph",
+neighbor lists for vertices 0..N-1, self-loops included. problem is a solve.PROBLEMS name, options are
+solver constructor options (e.g. engine, bounds, max_width), deadline is seconds from
+receipt, time spent queued included, and "node_limit" caps the search nodes.
+
+Every request gets one answer: {"id", "status", "result", "solution", "lower_bound",
+"stopped", "seconds"} with status "optimal", "incumbent" (the best found when the
+deadline or node limit ran out, or by a search that can't prove it optimal, such as
+with greedy preprocessing) or "cancelled" (the best found so far, or nothing
+more if it was still queued); {"id", "status": "expired"} when the deadline passed
+while queued; {"id", "status": "error", "error"} when it couldn't be solved.
+Answers come in the order requests finish. {"cancel": 7} cancels request 7 and is
+answered with {"cancel": 7, "found": true or false}; closing the connection cancels
+all of its requests.
+'''
+
+import argparse
+import asyncio
+import concurrent.futures
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import time
+
+from anytime import Limits
+from generators import FromEdges
+from solve import PROBLEMS, SolveGraph
+
+HOST = "127.0.0.1"  # TCP is only served locally: there is no authentication
+
+# Longest request line in bytes (asyncio's default of 64 KiB is a small graph)
+LINE_LIMIT = 64 * 1024 * 1024
+
+# Solver constructor options the server sets itself
+RESERVED_OPTIONS = ("limits", "on_incumbent", "stats")
+
+def CheckVertex(v, num_vertices):
+    if type(v) is not int or not 0 <= v < num_vertices:
+        raise ValueError(f"bad vertex {v!r}, expected 0..{num_vertices - 1}")
+
+def RequestGraph(request):
+    # graph[v] = set of neighbors of v, from a request's "edges" (and "vertices") or "graph".
+    # Self-loops stay, as with loaded graphs: [v, v] means v must be in every vertex cover.
+    if "graph" in request:
+        lists = request["graph"]
+        graph = [set() for _ in lists]
+        for v, neighbors in enumerate(lists):
+            for u in neighbors:
+                CheckVertex(u, len(lists))
+                graph[v].add(u)
+                graph[u].add(v)
+        return graph
+    if "edges" in request:
+        edges = [tuple(edge) for edge in request["edges"]]
+        if any(len(edge) != 2 for edge in edges):
+            raise ValueError("edges must be [a, b] pairs")
+        num_vertices = request.get("vertices", 1 + max((max(edge) for edge in edges), default=-1))
+        for edge in edges:
+            CheckVertex(edge[0], num_vertices)
+            CheckVertex(edge[1], num_vertices)
+        return FromEdges(num_vertices, edges)
+    raise ValueError('a request needs "edges" or "graph"')
+
+def RunJob(problem, graph, state, options, time_limit, node_limit, cancel):
+    # In a pool process: solve one request, returning its answer without the id
+    limits = Limits(time_limit, node_limit, cancel)
+    try:
+        answer = SolveGraph(problem, graph, state, limits, **options)
+    except Exception as error:
+        return dict(status="error", error=f"{type(error).__name__}: {error}")
+    if not answer["stopped"]:
+        status = "optimal" if answer["lower_bound"] == answer["result"] else "incumbent"
+    elif cancel.is_set():
+        status = "cancelled"
+    else:
+        status = "incumbent"
+    return dict(status=status, **answer)
+
+def Warm():
+    # Runs once per pool process at startup, so the first requests don't pay for starting them
+    return os.getpid()
+
+class Client:
+    def __init__(self, writer):
+        self.writer = writer
+        self.closed = False
+
+    def Send(self, message): # Write one answer line, unless the client has gone
+        if not self.closed:
+            self.writer.write(json.dumps(message).encode() + b"\n")
+
+class Job:
+    def __init__(self, client, request):
+        '''
+        A validated solve request from client, queued or running. Raises ValueError
+        for a malformed one.
+        '''
+        self.client = client
+        self.id = request.get("id")
+        if type(self.id) not in (int, str):
+            raise ValueError('a request needs an "id", a number or string')
+        self.problem = request.get("problem")
+        if self.problem not in PROBLEMS:
+            raise ValueError(f"unknown problem {self.problem!r}, expected one of {sorted(PROBLEMS)}")
+        self.state = request.get("state", "set")
+        if self.state not in PROBLEMS[self.problem].SOLVERS:
+            raise ValueError(f"unknown state representation {self.state!r}, "
+                             f"expected one of {sorted(PROBLEMS[self.problem].SOLVERS)}")
+        self.options = request.get("options", {})
+        if not isinstance(self.options, dict) or any(name in self.options for name in RESERVED_OPTIONS):
+            raise ValueError(f"options must be an object of solver options other than {', '.join(RESERVED_OPTIONS)}")
+        deadline = request.get("deadline")
+        if deadline is not None and (type(deadline) not in (int, float) or deadline <= 0):
+            raise ValueError("deadline must be a positive number of seconds")
+        self.deadline = None if deadline is None else time.monotonic() + deadline
+        self.node_limit = request.get("node_limit")
+        if self.node_limit is not None and (type(self.node_limit) is not int or self.node_limit < 0):
+            raise ValueError("node_limit must be a non-negative integer")
+        self.graph = RequestGraph(request)
+        self.cancel = None   # Event the search checks, once it is running
+        self.done = False    # Answered (finished, cancelled while queued or expired)
+
+    def TimeLimit(self): # Seconds left before the deadline, or None without one
+        return None if self.deadline is None else self.deadline - time.monotonic()
+
+class Server:
+    def __init__(self, workers=1, queue_size=100):
+        '''
+        Solves requests on workers processes, with at most queue_size waiting for one;
+        requests beyond that are answered with an error right away.
+        '''
+        self.workers = workers
+        self.queue = asyncio.Queue(queue_size)
+        self.jobs = {}  # (client, id) -> Job, for every unanswered request
+        self.executor = None
+        self.manager = None  # Serves the cancel Events shared with pool processes
+        self.dispatchers = []
+
+    async def Start(self):
+        self.manager = multiprocessing.Manager()
+        self.executor = concurrent.futures.ProcessPoolExecutor(self.workers)
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.executor, Warm) for _ in range(self.workers)))
+        # One dispatcher per process keeps every process busy while requests are queued
+        self.dispatchers = [asyncio.create_task(self.Dispatch()) for _ in range(self.workers)]
+
+    def Close(self):
+        # Stop the running searches and wait for the pool processes to exit
+        for task in self.dispatchers:
+            task.cancel()
+        for job in self.jobs.values():
+            if job.cancel is not None:
+                job.cancel.set()
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.manager.shutdown()
+
+    async def Serve(self, reader, writer):
+        # Handle one connection: its requests in order, its answers as they are ready
+        client = Client(writer)
+        try:
+            while line := await reader.readline():
+                if line.strip():
+                    self.Handle(client, line)
+                await writer.drain()
+        except (ConnectionError, ValueError) as error:  # ValueError: a line over LINE_LIMIT
+            print(f"dropping client: {error}", file=sys.stderr)
+        finally:
+            client.closed = True
+            for job in [job for job in self.jobs.values() if job.client is client]:
+                self.Cancel(job)
+            writer.close()
+
+    def Handle(self, client, line):
+        try:
+            request = json.loads(line)
+        except ValueError as error:
+            client.Send(dict(status="error", error=f"bad JSON: {error}"))
+            return
+        if not isinstance(request, dict):
+            client.Send(dict(status="error", error="a request must be a JSON object"))
+            return
+        if "cancel" in request:
+            job = self.jobs.get((client, request["cancel"])) if type(request["cancel"]) in (int, str) else None
+            client.Send(dict(cancel=request["cancel"], found=job is not None))
+            if job is not None:
+                self.Cancel(job)
+            return
+        try:
+            job = Job(client, request)
+        except (ValueError, TypeError) as error:
+            client.Send(dict(id=request.get("id"), status="error", error=str(error)))
+            return
+        if (client, job.id) in self.jobs:
+            client.Send(dict(id=job.id, status="error", error=f"request {job.id!r} is already queued or running"))
+            return
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            client.Send(dict(id=job.id, status="error", error="queue full, try again later"))
+            return
+        self.jobs[client, job.id] = job
+
+    def Cancel(self, job):
+        if job.cancel is None:  # Still queued: answer now, the dispatcher skips it
+            self.Finish(job, dict(status="cancelled"))
+        else:  # Running: the search stops at its next clock check and answers with its best
+            job.cancel.set()
+
+    def Finish(self, job, answer):
+        job.done = True
+        del self.jobs[job.client, job.id]
+        job.client.Send(dict(id=job.id, **answer))
+
+    async def Dispatch(self):
+        # Run queued jobs one at a time on the pool, until cancelled by Close
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            if job.done:
+                continue
+            time_limit = job.TimeLimit()
+            if time_limit is not None and time_limit <= 0:
+                self.Finish(job, dict(status="expired"))
+                continue
+            job.cancel = self.manager.Event()
+            try:
+                answer = await loop.run_in_executor(self.executor, RunJob, job.problem, job.graph, job.state,
+                                                    job.options, time_limit, job.node_limit, job.cancel)
+            except concurrent.futures.process.BrokenProcessPool as error:
+                answer = dict(status="error", error=f"solver process died: {error}")
+            self.Finish(job, answer)
+
+async def Run(args):
+    server = Server(args.workers, args.queue)
+    await server.Start()
+    if args.socket:
+        listener = await asyncio.start_unix_server(server.Serve, args.socket, limit=LINE_LIMIT)
+        where = args.socket
+    else:
+        listener = await asyncio.start_server(server.Serve, HOST, args.port, limit=LINE_LIMIT)
+        where = f"{HOST}:{args.port}"
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    print(f"serving on {where} with {args.workers} workers", file=sys.stderr, flush=True)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.Close()
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve vertex cover and dominating set solves over a local socket.")
+    where = parser.add_mutually_exclusive_group()
+    where.add_argument("--socket", metavar="PATH", help="listen on this Unix socket")
+    where.add_argument("--port", type=int, default=8765, help=f"listen on this TCP port of {HOST} (default: 8765)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="solver processes (default: one per CPU)")
+    parser.add_argument("--queue", type=int, default=100, help="requests that may wait for a process (default: 100)")
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    try:
+        asyncio.run(Run(args))
+    except (KeyboardInterrupt, asyncio.CancelledError):  # Ctrl-C, or SIGTERM cancelling Run
+        pass
@@ -0,0 +1,204 @@
+'''
+One command line for both solvers: pick the problem, then the state representation,
+engine, branching, preprocessing, bounds and parallelism by flag. Every option runs
+on the same solver core (main.Solver, backup_power_solver.Solver), so comparing two
+configurations is a change of flags, not of scripts.
+
+main.py and backup_power_solver.py run the same command lines for their problem, and
+the old single-purpose scripts (include_first.py, ...) are thin wrappers around it.
+
+python3 solve.py vertex-cover < input.txt
+python3 solve.py vc --engine iterative --branching max_degree loupekine_snark.txt
+python3 solve.py vc --engine clone --cloning deepcopy --first exclude --preprocess none --profile < input.txt
+python3 solve.py dominating-set --engine iterative graph.txt
+python3 solve.py ds --format edges --stats petersen.txt
+python3 solve.py vc --batch graphs/ --jobs 4   (one JSON line per graph, see batch.py)
+
+Other Python code can skip files and flags: SolveGraph solves a graph held in memory.
+'''
+
+import argparse
+import sys
+import time
+
+import backup_power_solver
+import main
+from anytime import JsonLinePrinter, Limits
+from loader import LoadGraph
+from stats import SearchStats
+
+# Solver module for each problem name, with the short aliases
+PROBLEMS = {
+    "vertex-cover": main,
+    "vc": main,
+    "dominating-set": backup_power_solver,
+    "ds": backup_power_solver,
+}
+
+def SolveGraph(problem, graph, state="set", limits=None, **options):
+    '''
+    Solve graph (graph[v] = the neighbors of v, for v = 0..N-1) for problem, a PROBLEMS
+    name, with the given state representation and solver constructor options. Returns
+    dict(result, solution, lower_bound, stopped, seconds): with limits (anytime.Limits)
+    that ran out, result is the best found so far and stopped is True.
+    '''
+    if problem not in PROBLEMS:
+        raise ValueError(f"unknown problem {problem!r}, expected one of {sorted(PROBLEMS)}")
+    solvers = PROBLEMS[problem].SOLVERS
+    if state not in solvers:
+        raise ValueError(f"unknown state representation {state!r}, expected one of {sorted(solvers)}")
+    start = time.perf_counter()
+    solver = solvers[state](graph, limits=limits, **options)
+    result = solver.Solve()
+    return dict(result=result, solution=Solution(solver), lower_bound=solver.lower_bound,
+                stopped=limits is not None and limits.stopped, seconds=round(time.perf_counter() - start, 6))
+
+def Solution(solver): # Sorted vertices of solver's best solution, or None if only its size is known
+    solution = solver.best_solution
+    return None if solution is None else sorted(solution)
+
+def AddCommonArguments(parser, module, max_width, text_format, profile):
+    # Options both problems have; module is main or backup_power_solver
+    parser.add_argument("graph", nargs="?",
+                        help="text or binary graph file, or with --batch a directory or file of graphs (default: read text from stdin)")
+    parser.add_argument("--format", choices=("edges", "adjacency"), default=text_format,
+                        help=f"text graph format: \"N M\" + edge list, or adjacency lists (default: {text_format})")
+    parser.add_argument("--state", choices=module.SOLVERS, default="set", help="problem state representation (default: set)")
+    parser.add_argument("--engine", choices=module.ENGINES, default="iterative",
+                        help="search engine; clone recurses once per decision, so big graphs overflow the stack (default: iterative)")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes for a parallel search (default: 1)")
+    parser.add_argument("--schedule", choices=("static", "stealing"), default="static",
+                        help="how a parallel search shares work; stealing needs --engine iterative (default: static)")
+    parser.add_argument("--no-components", dest="components", action="store_false",
+                        help="search a disconnected graph as a whole instead of one component at a time")
+    parser.add_argument("--max-width", type=int, default=max_width,
+                        help=f"solve by tree decomposition DP when the width is at most this, 0 to always branch (default: {max_width})")
+    parser.add_argument("--local-search", type=float, default=0, metavar="SECONDS",
+                        help="improve the greedy solution by local search for this long before searching (default: 0)")
+    parser.add_argument("--alongside", type=float, default=0, metavar="SECONDS",
+                        help="with --workers, also run local search next to the workers for up to this long (default: 0)")
+    parser.add_argument("--heuristic", action="store_true",
+                        help="only print the size of the greedy (and --local-search) solution, without searching")
+    parser.add_argument("--time-limit", type=float, metavar="SECONDS",
+                        help="stop searching after this long and print the best count found so far")
+    parser.add_argument("--node-limit", type=int, metavar="N", help="stop searching after N search nodes")
+    parser.add_argument("--progress", action="store_true",
+                        help="write every better solution to stderr as it is found, as a JSON line")
+    parser.add_argument("--stats", action="store_true",
+                        help="write search statistics (nodes, prunes, improvements, ...) to stderr as JSON when done")
+    parser.add_argument("--batch", action="store_true",
+                        help="solve many graphs, one JSON line each: the files of a directory, or text graphs separated by --- lines")
+    parser.add_argument("--jobs", type=int, default=1, help="with --batch, processes solving graphs side by side (default: 1)")
+    parser.add_argument("--profile", nargs="?", const=profile, metavar="FILE",
+                        help=f"run under cProfile and save the profile to FILE (default: {profile}), e.g. for snakeviz")
+
+def Parser(profile="solve.prof"): # profile: the file --profile writes when not given one
+    parser = argparse.ArgumentParser(description="Solve minimum vertex cover (toll stations) or minimum dominating set (backup generators).")
+    problems = parser.add_subparsers(dest="problem", required=True, metavar="PROBLEM")
+
+    vertex_cover = problems.add_parser("vertex-cover", aliases=["vc"], help="minimum number of toll stations")
+    AddCommonArguments(vertex_cover, main, 8, "edges", profile)
+    vertex_cover.add_argument("--graph", dest="graph_option", help=argparse.SUPPRESS)  # main.py's old spelling
+    vertex_cover.add_argument("--preprocess", choices=main.PREPROCESSORS, default="kernel",
+                              help="graph reductions before searching (default: kernel)")
+    vertex_cover.add_argument("--branching", choices=main.BRANCHING, default="order",
+                              help="branching policy for the undo/iterative engines (default: order)")
+    vertex_cover.add_argument("--first", choices=main.FIRST, default="include",
+                              help="case searched first at each branch; exclude needs the clone or undo engine (default: include)")
+    vertex_cover.add_argument("--cloning", choices=main.CLONING, default="clone",
+                              help="how the clone engine copies states (default: clone)")
+    vertex_cover.add_argument("--bound", choices=main.LOWER_BOUNDS, action="append", default=[],
+                              help="lower bound used for pruning, may be repeated")
+    vertex_cover.add_argument("--cache", type=int, default=0, metavar="MB",
+                              help="transposition cache size for the undo/iterative engines, for the whole solve (per process with --workers), 0 for none (default: 0)")
+    vertex_cover.add_argument("--decide", type=int, metavar="K", help="only answer whether K stations are enough (yes/no)")
+    vertex_cover.add_argument("--deepening", action="store_true",
+                              help="find the optimum by deciding k = lower bound, lower bound + 1, ... in turn")
+
+    dominating_set = problems.add_parser("dominating-set", aliases=["ds"], help="minimum number of backup generators")
+    AddCommonArguments(dominating_set, backup_power_solver, 5, "adjacency", profile)
+    return parser
+
+def IsVertexCover(args):
+    return PROBLEMS[args.problem] is main
+
+def BuildSolver(args, graph, limits=None, stats=None, on_incumbent=None):
+    # The solver args asks for, on an already loaded graph
+    common = dict(engine=args.engine, components=args.components, max_width=args.max_width,
+                  local_search=args.local_search, limits=limits, on_incumbent=on_incumbent, stats=stats)
+    if IsVertexCover(args):
+        return main.SOLVERS[args.state](graph, bounds=args.bound, preprocess=args.preprocess, branching=args.branching,
+                                        cache=args.cache, first=args.first, cloning=args.cloning, **common)
+    return backup_power_solver.SOLVERS[args.state](graph, **common)
+
+def Source(args): # The graph file (or batch directory) args name, None for stdin
+    return args.graph or getattr(args, "graph_option", None)
+
+def LoadInput(args):
+    # The graph named by args (stdin when none), as the loaded CSR graph
+    return LoadGraph(Source(args), args.format, keep_sets=IsVertexCover(args))
+
+def Run(args, solver):
+    '''
+    Run solver as args ask and return what to print: the optimum (or best found within
+    the limits), the heuristic size, or yes/no/unknown for --decide.
+    '''
+    if args.heuristic:
+        return len(solver.HeuristicCover() if IsVertexCover(args) else solver.HeuristicSet())
+    if IsVertexCover(args) and args.decide is not None:
+        result = "yes" if solver.Solve(k=args.decide) else "no"
+        if result == "no" and solver.limits is not None and solver.limits.stopped:
+            result = "unknown"
+        return result
+    if IsVertexCover(args) and args.deepening:
+        return solver.SolveDeepening()
+    if args.workers > 1:
+        from parallel import ParallelSolver
+        return ParallelSolver(solver, workers=args.workers, schedule=args.schedule,
+                              local_search=args.alongside).Solve()
+    return solver.Solve()
+
+def Main(argv=None, profile="solve.prof"):
+    parser = Parser(profile)
+    args = parser.parse_args(argv)
+    if args.batch and args.progress:
+        parser.error("--progress can't be used with --batch")
+    if args.batch and args.jobs > 1 and args.workers > 1:
+        parser.error("use either --jobs or --workers with --batch, not both")
+    if args.workers > 1 and (getattr(args, "decide", None) is not None or getattr(args, "deepening", False)):
+        parser.error("--decide and --deepening search in one process, without --workers")
+
+    # Python's cProfile module to analyze where time is being spent in the program.
+    # It slows the search down a lot, so only when asked for.
+    profiler = None
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    if args.batch:
+        from batch import RunBatch
+        failed = RunBatch(args)
+    else:
+        Solve(args)
+
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(args.profile)  # Save stats for SnakeViz
+    if args.batch and failed:
+        sys.exit(1)
+
+def Solve(args): # Solve the one graph args name and print the answer
+    stats = SearchStats() if args.stats else None
+    limits = None
+    if args.time_limit is not None or args.node_limit is not None:
+        limits = Limits(args.time_limit, args.node_limit)
+    solver = BuildSolver(args, LoadInput(args), limits, stats, JsonLinePrinter() if args.progress else None)
+    print(Run(args, solver))
+    if limits is not None and limits.stopped:
+        print(f"stopped early after {limits.nodes} nodes: lower bound {solver.lower_bound}", file=sys.stderr)
+    if stats is not None:
+        stats.Print(sys.stderr)
+
+if __name__ == "__main__":
+    Main()
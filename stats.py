@@ -0,0 +1,60 @@
+'''
+Search statistics: counters a solver updates as it searches, cheap enough to leave on
+for real runs (unlike a profiler, which slows the search down several times).
+
+A SearchStats object is shared by a solver and every solver it spawns (kernel,
+components), like anytime.Limits, so it covers the whole solve; parallel workers
+count into their own copies, so there it only covers the parent process.
+'''
+
+import json
+import time
+
+# Why a node was cut off: its stations already reach best ("bound"), stations plus a
+# lower bound do ("lower_bound"), it can't be completed at all ("infeasible"), or the
+# transposition cache already settled it ("cache")
+PRUNE_REASONS = ("bound", "lower_bound", "infeasible", "cache")
+
+class SearchStats:
+    def __init__(self):
+        self.start = time.monotonic()
+        self.nodes = 0         # Search nodes expanded
+        self.max_depth = 0     # Deepest node (decisions from the root of its search)
+        self.prunes = dict.fromkeys(PRUNE_REASONS, 0)
+        self.improvements = []  # (seconds since start, count) for every better solution found
+        self.checks = 0         # Calls to the node checks timed by Timed
+        self.check_seconds = 0.0
+
+    def Node(self, depth):
+        self.nodes += 1
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def Prune(self, reason):
+        self.prunes[reason] += 1
+
+    def Improved(self, count):
+        self.improvements.append((round(time.monotonic() - self.start, 6), count))
+
+    def Timed(self, check):
+        '''
+        check wrapped to add its calls and running time to checks and check_seconds.
+        Solvers only install these when they have stats, so without stats the checks
+        cost nothing extra.
+        '''
+        def Run(*args):
+            start = time.perf_counter()
+            result = check(*args)
+            self.check_seconds += time.perf_counter() - start
+            self.checks += 1
+            return result
+
+        return Run
+
+    def AsDict(self): # For JSON output
+        return dict(seconds=round(time.monotonic() - self.start, 6), nodes=self.nodes, max_depth=self.max_depth,
+                    prunes=dict(self.prunes), improvements=[list(entry) for entry in self.improvements],
+                    checks=self.checks, check_seconds=round(self.check_seconds, 6))
+
+    def Print(self, stream):
+        print(json.dumps(self.AsDict()), file=stream, flush=True)
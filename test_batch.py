@@ -0,0 +1,66 @@
+'''
+Tests for batch.py: a stream splits into its graphs at --- lines (CRLF too, blank
+documents skipped), a directory gives its files in name order without dotfiles, and
+a graph that can't be read gets an error line while the rest of the batch carries on.
+
+python3 -m pytest -q test_batch.py
+'''
+
+import io
+import json
+
+import pytest
+
+import solve
+from batch import RunBatch
+
+PATH = b"4 3\n0 1\n1 2\n2 3\n"        # Cover of 2
+TRIANGLE = b"3 3\r\n0 1\r\n1 2\r\n2 0\r\n"  # Cover of 2, CRLF throughout
+STAR = b"5 4\n0 1\n0 2\n0 3\n0 4\n"   # Cover of 1
+MALFORMED = b"3 2\n0 one\n"
+
+def Batch(argv):
+    # RunBatch's JSON lines for solve.py argv, and how many graphs failed
+    stream = io.StringIO()
+    failed = RunBatch(solve.Parser().parse_args(argv), stream)
+    return [json.loads(line) for line in stream.getvalue().splitlines()], failed
+
+def test_stream_splits_at_separators(tmp_path):
+    path = tmp_path / "graphs.txt"
+    path.write_bytes(PATH + b"---\r\n" + TRIANGLE + b"--- \n" + MALFORMED + b"---\n" + STAR + b"---\r\n\r\n")
+    lines, failed = Batch(["vc", "--batch", str(path)])
+    assert [line["graph"] for line in lines] == [f"{path}:{i}" for i in range(4)]
+    assert failed == 1
+    assert "error" in lines[2] and "result" not in lines[2]
+    assert [line.get("result") for line in lines] == [2, 2, None, 1]
+    assert all(line["stopped"] is False for line in lines if "result" in line)
+
+def test_directory_in_name_order_without_dotfiles(tmp_path):
+    for name, data in (("b.txt", STAR), ("a.txt", PATH), (".hidden", MALFORMED), ("c.txt", MALFORMED)):
+        (tmp_path / name).write_bytes(data)
+    (tmp_path / "nested").mkdir()
+    lines, failed = Batch(["vc", "--batch", str(tmp_path)])
+    assert [line["graph"] for line in lines] == ["a.txt", "b.txt", "c.txt"]
+    assert [line.get("result") for line in lines] == [2, 1, None]
+    assert failed == 1
+
+def test_jobs_give_the_same_lines(tmp_path):
+    path = tmp_path / "graphs.txt"
+    path.write_bytes(b"---\n".join((PATH, TRIANGLE, STAR, MALFORMED)))
+    serial, serial_failed = Batch(["vc", "--batch", str(path)])
+    pooled, pooled_failed = Batch(["vc", "--batch", str(path), "--jobs", "2"])
+    key = lambda line: line["graph"]
+    strip = lambda lines: [{k: v for k, v in line.items() if k != "seconds"} for line in sorted(lines, key=key)]
+    assert strip(serial) == strip(pooled)
+    assert serial_failed == pooled_failed == 1
+
+def test_failures_set_the_exit_status(tmp_path, capsys):
+    path = tmp_path / "graphs.txt"
+    path.write_bytes(PATH + b"---\n" + MALFORMED)
+    with pytest.raises(SystemExit) as exit:
+        solve.Main(["vc", "--batch", str(path)])
+    assert exit.value.code == 1
+    assert len(capsys.readouterr().out.splitlines()) == 2
+    path.write_bytes(PATH + b"---\n" + STAR)
+    solve.Main(["vc", "--batch", str(path)])
+    assert [json.loads(line)["result"] for line in capsys.readouterr().out.splitlines()] == [2, 1]
@@ -0,0 +1,56 @@
+'''
+Tests for benchmark.py and the generators it runs: every suite graph is the same on
+every run (and in every process), and the variants named for an engine, state or
+branching policy really search, agreeing with each other and the reference optimum.
+
+python3 -m pytest -q test_benchmark.py
+'''
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from benchmark import DEFAULT_VARIANTS, SUITES, VARIANTS, Benchmark, Disagreements
+from generators import Generate
+from reference import Optimum
+
+SPECS = sorted({spec for specs in SUITES.values() for spec in specs})
+
+def Edges(graph):
+    return sorted((a, b) for a in range(len(graph)) for b in graph[a] if a <= b)
+
+def test_suite_graphs_are_reproducible():
+    for spec in SPECS:
+        assert Edges(Generate(spec)) == Edges(Generate(spec)), spec
+    assert Edges(Generate("gnp:30:0.2:1")) != Edges(Generate("gnp:30:0.2:2"))
+
+def test_suite_graphs_are_the_same_in_another_process():
+    # Baselines are compared across runs, so hash randomization mustn't change a graph
+    script = "import json, sys; from generators import Generate; " \
+             "print(json.dumps({s: sorted((a, b) for a, g in enumerate(Generate(s)) for b in g if a <= b) " \
+             "for s in sys.argv[1:]}))"
+    environment = dict(os.environ, PYTHONHASHSEED="12345")
+    output = subprocess.run([sys.executable, "-c", script] + SPECS, capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)), env=environment).stdout
+    other = json.loads(output)
+    for spec in SPECS:
+        assert [tuple(edge) for edge in other[spec]] == Edges(Generate(spec)), spec
+
+@pytest.mark.parametrize("spec", ["grid:4:6", "gnp:30:0.2:1"])
+def test_variants_search(spec):
+    variants = [name for name in DEFAULT_VARIANTS if not name.endswith("-default")]
+    results = Benchmark([spec], variants, repeat=1, warmup=0, time_limit=30, memory=False)
+    assert not Disagreements(results)
+    graph = Generate(spec)
+    for result in results:
+        problem = "vc" if VARIANTS[result["variant"]][0] == "vertex_cover" else "ds"
+        assert not result["stopped"], result["variant"]
+        assert result["nodes"] > 1, result["variant"]
+        assert result["answer"] == Optimum(problem, graph), result["variant"]
+
+def test_clone_variant_searches():
+    results = Benchmark(["grid:3:4"], ["vc-clone", "ds-clone"], repeat=1, warmup=0, time_limit=30, memory=False)
+    assert all(result["nodes"] > 1 and not result["stopped"] for result in results)
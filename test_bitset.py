@@ -0,0 +1,37 @@
+'''
+Differential tests for the bitset state representation (BitsetSolver) of both
+problems: on every engine, with the plain branch search and with the default
+preprocessing, it must find the reference optimum and a valid solution of that size
+(the dominating set DP over a tree decomposition only finds the size).
+
+python3 -m pytest -q test_bitset.py
+'''
+
+import pytest
+
+import backup_power_solver
+import main
+from generators import Grid, Named
+from reference import PLAIN, Cases, IsCover, IsDominating, Optimum, RandomGraphs
+from solve import SolveGraph
+
+def Graphs():
+    # (name, graph[v] = set of neighbors)
+    return RandomGraphs((10, 16), (0.15, 0.3), range(3)) + [("grid", Grid(3, 5)), ("petersen", Named("petersen"))]
+
+@pytest.mark.parametrize("name, graph, engine", Cases(Graphs(), main.ENGINES))
+def test_bitset_vertex_cover_matches_reference(name, graph, engine):
+    optimum = Optimum("vc", graph)
+    for options in (dict(PLAIN["vc"], engine=engine), dict(engine=engine)):
+        answer = SolveGraph("vc", graph, state="bitset", **options)
+        assert answer["result"] == optimum, options
+        assert IsCover(graph, set(answer["solution"])) and len(answer["solution"]) == optimum, options
+
+@pytest.mark.parametrize("name, graph, engine", Cases(Graphs(), backup_power_solver.ENGINES))
+def test_bitset_dominating_set_matches_reference(name, graph, engine):
+    optimum = Optimum("ds", graph)
+    for options, plain in ((dict(PLAIN["ds"], engine=engine), True), (dict(engine=engine), False)):
+        answer = SolveGraph("ds", graph, state="bitset", **options)
+        assert answer["result"] == optimum, options
+        if plain or answer["solution"] is not None:
+            assert IsDominating(graph, set(answer["solution"])) and len(answer["solution"]) == optimum, options
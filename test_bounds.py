@@ -0,0 +1,50 @@
+'''
+Differential tests for main.Solver's pluggable lower bounds (LOWER_BOUNDS): pruning
+with the matching bound, the clique cover bound or both must keep the reference
+optimum on every engine, and the bounds must never exceed it.
+
+python3 -m pytest -q test_bounds.py
+'''
+
+import pytest
+
+import main
+from generators import Complete, Grid, Named
+from reference import PLAIN, Cases, IsCover, Optimum, RandomGraphs
+from stats import SearchStats
+
+BOUNDS = [("matching",), ("clique",), ("matching", "clique")]
+
+def Graphs():
+    # (name, graph[v] = set of neighbors), dense ones included so clique covers are worth something
+    return RandomGraphs((12, 16), (0.2, 0.5), range(2)) \
+        + [("grid", Grid(3, 5)), ("complete", Complete(7)), ("petersen", Named("petersen"))]
+
+@pytest.mark.parametrize("name, graph, bounds", Cases(Graphs(), BOUNDS))
+def test_pruning_keeps_the_optimum(name, graph, bounds):
+    optimum = Optimum("vc", graph)
+    for engine in main.ENGINES:
+        for state in main.SOLVERS:
+            solver = main.SOLVERS[state](graph, bounds=bounds, **dict(PLAIN["vc"], engine=engine))
+            assert solver.Solve() == optimum, (engine, state)
+            assert IsCover(graph, set(solver.best_stations)) and len(solver.best_stations) == optimum
+
+@pytest.mark.parametrize("name, graph", Graphs())
+def test_bounds_never_exceed_the_optimum(name, graph):
+    optimum = Optimum("vc", graph)
+    solver = main.Solver(graph, **PLAIN["vc"])
+    state = solver.NewState()
+    for bound in main.LOWER_BOUNDS.values():
+        assert getattr(solver, bound)(state) <= optimum, bound
+
+def test_bounds_prune():
+    # On a dense graph the bounds cut off nodes, and fewer are searched than without them
+    graph = RandomGraphs((18,), (0.5,), (0,))[0][1]
+    nodes = {}
+    for bounds in [()] + BOUNDS:
+        stats = SearchStats()
+        main.Solver(graph, bounds=bounds, stats=stats, **PLAIN["vc"]).Solve()
+        nodes[bounds] = stats.AsDict()
+    for bounds in BOUNDS:
+        assert nodes[bounds]["prunes"]["lower_bound"] > 0, bounds
+        assert nodes[bounds]["nodes"] < nodes[()]["nodes"], bounds
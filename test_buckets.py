@@ -0,0 +1,32 @@
+'''
+Tests for buckets.py: Pick leaves the element it returns in the bucket, keeps a dense
+bucket as it is and rebuilds one that removals left mostly empty.
+
+python3 -m pytest -q test_buckets.py
+'''
+
+from buckets import Pick
+
+def test_pick_keeps_a_dense_bucket():
+    bucket = set(range(100))
+    v, kept = Pick(bucket)
+    assert kept is bucket
+    assert v in bucket and len(bucket) == 100
+
+def test_pick_rebuilds_a_sparse_bucket():
+    bucket = set(range(10000))
+    for v in range(1, 10000):
+        bucket.discard(v)
+    v, kept = Pick(bucket)
+    assert v == 0 and kept == {0}
+    assert kept is not bucket
+    assert Pick(kept)[1] is kept
+
+def test_picking_through_a_bucket_sees_every_element():
+    bucket = set(range(0, 2000, 3))
+    seen = []
+    while bucket:
+        v, bucket = Pick(bucket)
+        bucket.discard(v)
+        seen.append(v)
+    assert sorted(seen) == list(range(0, 2000, 3))
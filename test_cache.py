@@ -0,0 +1,113 @@
+'''
+Tests for cache.py and the transposition cache in main.Solver's in-place engines:
+the LRU bookkeeping, answers matching the reference search without a cache, and every
+cached value being what it claims, the exact optimum or a lower bound of its residual
+graph.
+
+python3 -m pytest -q test_cache.py
+'''
+
+import pytest
+
+import main
+from cache import ENTRY_OVERHEAD, TranspositionCache
+from generators import Grid, Named
+from reference import PLAIN, Optimum, RandomGraphs
+from solve import SolveGraph
+
+def Graphs():
+    # (name, graph[v] = set of neighbors): dense enough that the search revisits residual graphs
+    return RandomGraphs((12, 18), (0.2, 0.4), range(3)) \
+        + [("grid", Grid(4, 4)), ("petersen", Named("petersen")), ("heawood", Named("heawood"))]
+
+def Residual(graph, mask):
+    # The graph induced by the bits of mask: the relays still uncovered at a cached node
+    vertices = [v for v in range(len(graph)) if mask >> v & 1]
+    index = {v: i for i, v in enumerate(vertices)}
+    return [{index[u] for u in graph[v] if u in index} for v in vertices]
+
+def test_get_counts_hits_and_misses():
+    cache = TranspositionCache(1 << 20)
+    assert cache.Get(5) is None
+    cache.Put(5, 3, False)
+    assert cache.Get(5) == (3, False)
+    assert (cache.hits, cache.misses, len(cache)) == (1, 1, 1)
+
+def test_put_keeps_the_stronger_entry():
+    cache = TranspositionCache(1 << 20)
+    cache.Put(1, 4, False)
+    cache.Put(1, 2, False)  # A weaker lower bound doesn't replace a stronger one
+    assert cache.Get(1) == (4, False)
+    cache.Put(1, 6, False)
+    assert cache.Get(1) == (6, False)
+    cache.Put(1, 5, True)   # An exact value beats any bound
+    assert cache.Get(1) == (5, True)
+    cache.Put(1, 7, False)
+    assert cache.Get(1) == (5, True)
+
+def test_new_space_is_fresh_every_time():
+    cache = TranspositionCache(1 << 20)
+    assert len({cache.NewSpace() for _ in range(5)}) == 5
+
+def test_evicts_least_recently_used_first():
+    cache = TranspositionCache(3 * (ENTRY_OVERHEAD + 28))  # Three small int keys
+    for key in (1, 2, 3):
+        cache.Put(key, key, True)
+    cache.Get(1)
+    cache.Put(4, 4, True)
+    assert cache.Get(2) is None
+    assert cache.Get(1) == (1, True)
+    assert cache.evictions == 1
+    assert cache.size <= cache.max_bytes
+
+@pytest.mark.parametrize("name, graph", Graphs())
+def test_cached_search_matches_plain_search(name, graph):
+    optimum = Optimum("vc", graph)
+    for engine in ("undo", "iterative"):
+        for branching in ("order", "max_degree"):
+            for preprocess in ("none", "kernel"):
+                answer = SolveGraph("vc", graph, engine=engine, branching=branching, preprocess=preprocess,
+                                    cache=1, max_width=0)
+                assert answer["result"] == optimum, (engine, branching, preprocess)
+
+@pytest.mark.parametrize("name, graph", Graphs())
+def test_tiny_cache_matches_plain_search(name, graph):
+    # Evicting all the time must only cost speed
+    solver = main.Solver(graph, cache=1, **PLAIN["vc"])
+    solver.cache = TranspositionCache(20 * ENTRY_OVERHEAD)
+    solver.cache_space = solver.cache.NewSpace()
+    assert solver.Solve() == Optimum("vc", graph)
+    assert solver.cache.size <= solver.cache.max_bytes
+
+@pytest.mark.parametrize("name, graph", Graphs())
+def test_cached_values_are_exact_or_lower_bounds(name, graph):
+    for engine in ("undo", "iterative"):
+        solver = main.Solver(graph, cache=1, **dict(PLAIN["vc"], engine=engine))
+        solver.Solve()
+        assert len(solver.cache) > 0
+        for (space, mask), (value, exact) in solver.cache.entries.items():
+            assert space == solver.cache_space
+            optimum = Optimum("vc", Residual(graph, mask))
+            if exact:
+                assert value == optimum, (engine, bin(mask))
+            else:
+                assert value <= optimum, (engine, bin(mask))
+
+@pytest.mark.parametrize("name, graph", Graphs())
+def test_spawned_solvers_share_one_cache(name, graph):
+    # Kernels and components get their own key spaces in the top solver's cache, not caches of their own
+    solver = main.Solver(graph, engine="iterative", cache=1)
+    spawned = []
+    spawn = solver.Spawn
+
+    def Spawn(graph):
+        sub = spawn(graph)
+        spawned.append(sub)
+        return sub
+
+    solver.Spawn = Spawn
+    assert solver.Solve() == Optimum("vc", graph)
+    for sub in spawned:
+        assert sub.cache is solver.cache
+        assert sub.cache_space != solver.cache_space
+    assert len({sub.cache_space for sub in spawned}) == len(spawned)
@@ -0,0 +1,79 @@
+'''
+Tests for main.Solver's k-bounded mode: Decide must say yes at k = optimum and no just
+below it, leaving best and lower_bound right either way, SolveDeepening must reach the
+optimum, and solve.py must answer unknown when the limits stop a decision.
+
+python3 -m pytest -q test_decide.py
+'''
+
+import pytest
+
+import main
+import solve
+from anytime import Limits
+from generators import Grid, Named
+from reference import IsCover, Optimum, RandomGraphs
+
+def Graphs():
+    # (name, graph[v] = set of neighbors)
+    return RandomGraphs((10, 16), (0.2, 0.35), range(2)) + [("grid", Grid(3, 4)), ("petersen", Named("petersen"))]
+
+@pytest.mark.parametrize("name, graph", Graphs())
+def test_decide_yes_at_the_optimum(name, graph):
+    optimum = Optimum("vc", graph)
+    for engine in main.ENGINES:
+        solver = main.Solver(graph, engine=engine)
+        assert solver.Solve(k=optimum), engine
+        assert solver.best == optimum, engine
+        assert IsCover(graph, solver.best_stations) and len(solver.best_stations) == optimum
+
+@pytest.mark.parametrize("name, graph", Graphs())
+def test_decide_no_below_the_optimum_keeps_best(name, graph):
+    optimum = Optimum("vc", graph)
+    for engine in main.ENGINES:
+        for preprocess in ("none", "kernel"):
+            solver = main.Solver(graph, engine=engine, preprocess=preprocess)
+            solver.ImproveTo(len(graph), list(range(len(graph))))
+            assert not solver.Solve(k=optimum - 1), (engine, preprocess)
+            # best and its stations are as before the failed decision, and nothing below optimum exists
+            assert solver.best == len(graph) and solver.best_stations == list(range(len(graph)))
+            assert solver.lower_bound == optimum, (engine, preprocess)
+            assert solver.Solve(k=optimum)
+            assert solver.best == optimum
+
+@pytest.mark.parametrize("name, graph", Graphs())
+def test_deepening_finds_the_optimum(name, graph):
+    optimum = Optimum("vc", graph)
+    for engine in main.ENGINES:
+        solver = main.Solver(graph, engine=engine)
+        assert solver.SolveDeepening() == optimum, engine
+        assert IsCover(graph, solver.best_stations) and len(solver.best_stations) == optimum
+        assert solver.lower_bound == optimum, engine
+
+def test_decide_out_of_nodes_is_unknown():
+    graph = RandomGraphs((40,), (0.2,), (0,))[0][1]
+    optimum = Optimum("vc", graph)
+    args = solve.Parser().parse_args(["vc", "--decide", str(optimum - 1), "--node-limit", "1", "--preprocess", "none",
+                                      "--max-width", "0", "--no-components"])
+    solver = solve.BuildSolver(args, graph, Limits(node_limit=1))
+    assert solve.Run(args, solver) == "unknown"
+    assert solver.limits.stopped
+    assert solver.lower_bound < optimum and solver.best == len(graph)
+
+def test_decide_and_deepening_refuse_workers(capsys):
+    for flags in (["--decide", "3"], ["--deepening"]):
+        with pytest.raises(SystemExit):
+            solve.Main(["vc", "petersen.txt", "--workers", "2"] + flags)
+        assert "--workers" in capsys.readouterr().err
+
+@pytest.mark.parametrize("name, graph", Graphs())
+def test_greedy_preprocessing_is_skipped_when_deciding(name, graph):
+    # Greedy stations may not fit in an optimal cover, so they can't decide anything
+    optimum = Optimum("vc", graph)
+    for engine in main.ENGINES:
+        solver = main.Solver(graph, engine=engine, preprocess="greedy", max_width=0)
+        assert solver.Solve(k=optimum), engine
+        assert not solver.Solve(k=optimum - 1), engine
+        assert solver.preprocess == "greedy"
+        deepening = main.Solver(graph, engine=engine, preprocess="greedy", max_width=0)
+        assert deepening.SolveDeepening() == optimum, engine
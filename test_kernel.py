@@ -0,0 +1,96 @@
+'''
+Differential tests for kernel.py: the reductions must keep the optimum, Lift must turn
+any cover of the kernel into a cover of the original graph, and a budget below the
+optimum must never look feasible, all checked against the reference search.
+
+python3 -m pytest -q test_kernel.py
+'''
+
+import pytest
+
+from anytime import SearchInterrupted
+from generators import Complete, FromEdges, Gnp, Grid, Named
+from kernel import Kernel
+from reference import IsCover, Plain, RandomGraphs, WithLoops
+from solve import SolveGraph
+
+def PlainCover(graph):
+    # (size, stations) of a minimum vertex cover by branching alone
+    answer = Plain("vc", graph)
+    return answer["result"], answer["solution"]
+
+def Graphs():
+    # (name, graph[v] = set of neighbors): random graphs around the rules' thresholds, plus shapes each rule targets
+    graphs = RandomGraphs((8, 12, 16), (0.1, 0.2, 0.35), range(3))
+    graphs += [
+        ("path", FromEdges(7, [(v, v + 1) for v in range(6)])),          # degree 1
+        ("cycle", FromEdges(9, [(v, (v + 1) % 9) for v in range(9)])),   # degree 2 folds
+        ("triangle-tail", FromEdges(5, [(0, 1), (1, 2), (2, 0), (2, 3), (3, 4)])),
+        ("star", FromEdges(6, [(0, v) for v in range(1, 6)])),           # crown
+        ("double-star", FromEdges(8, [(0, 1)] + [(0, v) for v in (2, 3, 4)] + [(1, v) for v in (5, 6, 7)])),
+        ("grid", Grid(3, 4)),
+        ("complete", Complete(6)),
+        ("petersen", Named("petersen")),
+        ("loops", WithLoops(Gnp(12, 0.2, 1), (0, 5, 9))),
+        ("isolated-loop", WithLoops(FromEdges(4, [(0, 1)]), (3,))),
+    ]
+    return graphs
+
+def Renumbered(kernel):
+    # The kernel's graph numbered 0..n-1, and the original label of each vertex
+    labels = sorted(kernel.graph)
+    index = {v: i for i, v in enumerate(labels)}
+    return [{index[u] for u in kernel.graph[v]} for v in labels], labels
+
+@pytest.mark.parametrize("name, graph", Graphs())
+def test_kernel_keeps_the_optimum(name, graph):
+    optimum, _ = PlainCover(graph)
+    kernel = Kernel(graph, optimum)
+    assert kernel.Reduce(), f"{name}: a budget of the optimum {optimum} was rejected"
+    residual, labels = Renumbered(kernel)
+    count, stations = PlainCover(residual)
+    assert kernel.Size() + count == optimum
+    cover = kernel.Lift(labels[v] for v in stations)
+    assert IsCover(graph, cover)
+    assert len(cover) == optimum
+
+@pytest.mark.parametrize("name, graph", Graphs())
+def test_kernel_rejects_a_budget_below_the_optimum(name, graph):
+    optimum, _ = PlainCover(graph)
+    kernel = Kernel(graph, optimum - 1)
+    if kernel.Reduce():
+        residual, _ = Renumbered(kernel)
+        assert kernel.Size() + PlainCover(residual)[0] > optimum - 1
+
+@pytest.mark.parametrize("name, graph", Graphs())
+def test_lift_covers_the_original_graph(name, graph):
+    # Any cover of the kernel lifts to a cover, one station per fold on top of forced
+    kernel = Kernel(graph, len(graph))
+    assert kernel.Reduce()
+    every = set(kernel.graph)
+    lifted = kernel.Lift(every)
+    assert IsCover(graph, lifted)
+    assert len(lifted) == kernel.Size() + len(every)
+
+@pytest.mark.parametrize("name, graph", Graphs())
+def test_kernel_preprocessing_matches_plain_search(name, graph):
+    optimum, _ = PlainCover(graph)
+    for engine in ("clone", "undo", "iterative"):
+        answer = SolveGraph("vc", graph, engine=engine, preprocess="kernel", max_width=0, components=False)
+        assert answer["result"] == optimum, engine
+        assert IsCover(graph, answer["solution"])
+        assert len(answer["solution"]) == optimum
+
+def test_reduce_polls_check():
+    # The limits' Check raises to abandon a reduction; it must be called even on a big graph
+    calls = []
+
+    def Check():
+        calls.append(None)
+        if len(calls) > 1:
+            raise SearchInterrupted()
+
+    kernel = Kernel(FromEdges(5000, [(v, v + 1) for v in range(4999)]), 5000)
+    with pytest.raises(SearchInterrupted):
+        kernel.Reduce(Check)
+    assert Kernel(Named("petersen"), 6).Reduce(lambda: calls.append(None))
@@ -0,0 +1,82 @@
+'''
+Tests for loader.py: both text formats load into the same CSR adjacency (notes after
+the relay list ignored), a binary file saved from it memory-maps back to the same
+graph, and files that aren't binary graphs are refused with ValueError.
+
+python3 -m pytest -q test_loader.py
+'''
+
+import pytest
+
+from generators import FromEdges
+from loader import HEADER, MAGIC, VERSION, IsBinary, LoadBinary, LoadGraph, ParseGraph, SaveBinary
+from reference import RandomGraphs, WithLoops
+
+def Graphs():
+    # (name, graph[v] = set of neighbors), with isolated vertices and self-loops
+    return RandomGraphs((1, 9, 30), (0.1, 0.4), range(2)) \
+        + [("loops", WithLoops(FromEdges(6, [(0, 1), (1, 2)]), (2, 5))), ("empty", FromEdges(4, []))]
+
+def EdgeText(graph, note=b""):
+    edges = [(a, b) for a in range(len(graph)) for b in sorted(graph[a]) if a <= b]
+    lines = [f"{len(graph)} {len(edges)}".encode()] + [f"{a} {b}".encode() for a, b in edges]
+    return b"\n".join(lines) + b"\n" + note
+
+def AdjacencyText(graph):
+    lines = [str(len(graph)).encode()] + [" ".join(map(str, [len(graph[v])] + sorted(graph[v]))).encode()
+                                           for v in range(len(graph))]
+    return b"\n".join(lines) + b"\n"
+
+def Neighbors(graph): # graph[v] as sets, for any graph form
+    return [set(graph[v]) for v in range(len(graph))]
+
+@pytest.mark.parametrize("name, graph", Graphs())
+def test_text_binary_round_trip(name, graph, tmp_path):
+    text = tmp_path / "graph.txt"
+    text.write_bytes(EdgeText(graph, b"Notes after the relays\n1 2\n"))
+    csr = LoadGraph(str(text))
+    assert Neighbors(csr) == graph
+    assert csr.Sets() == dict(enumerate(graph))
+    binary = tmp_path / "graph.csr"
+    SaveBinary(csr, str(binary))
+    assert IsBinary(str(binary)) and not IsBinary(str(text))
+    for loaded in (LoadBinary(str(binary)), LoadGraph(str(binary), "adjacency")):
+        assert (loaded.N, loaded.NumEdges()) == (csr.N, csr.NumEdges())
+        assert Neighbors(loaded) == graph
+        assert loaded.buffer is not None
+
+@pytest.mark.parametrize("name, graph", Graphs())
+def test_adjacency_format_matches_edge_list(name, graph, tmp_path):
+    path = tmp_path / "graph.txt"
+    path.write_bytes(AdjacencyText(graph))
+    assert Neighbors(LoadGraph(str(path), "adjacency")) == graph
+    assert Neighbors(ParseGraph(AdjacencyText(graph), "adjacency")) == graph
+    assert Neighbors(ParseGraph(EdgeText(graph), "edges", keep_sets=True)) == graph
+
+def test_repeated_edges_and_loops_count_once():
+    graph = ParseGraph(b"3 4\n0 1\n1 0\n2 2\n2 2\n")
+    assert Neighbors(graph) == [{1}, {0}, {2}]
+    assert graph.NumEdges() == 2
+
+def Header(num_vertices, num_edges, magic=MAGIC, version=VERSION):
+    return HEADER.pack(magic, version, num_vertices, num_edges)
+
+@pytest.mark.parametrize("data", [
+    b"",                                        # Empty
+    MAGIC + b"\x01",                            # Shorter than the header
+    Header(2, 1, magic=b"GRSC") + bytes(40),    # Not the magic
+    Header(2, 1, version=VERSION + 1) + bytes(40),
+    Header(5, 1) + bytes(16),                   # Offsets cut off
+    Header(1, 1) + (0).to_bytes(8, "little") + (2).to_bytes(8, "little") + bytes(4),  # Neighbors cut off
+])
+def test_malformed_binary_is_refused(data, tmp_path):
+    path = tmp_path / "bad.csr"
+    path.write_bytes(data)
+    with pytest.raises(ValueError):
+        LoadBinary(str(path))
+
+def test_malformed_text_is_refused():
+    with pytest.raises(ValueError):
+        ParseGraph(b"3 x\n0 1\n")
+    with pytest.raises(ValueError):
+        ParseGraph(b"3\n1 one\n0\n0\n", "adjacency")
@@ -0,0 +1,64 @@
+'''
+Tests for localsearch.py: whatever it returns must be a cover (dominating set), never
+smaller than the reference optimum, and on small graphs it should reach that optimum.
+Seeded, so the runs are repeatable.
+
+python3 -m pytest -q test_localsearch.py
+'''
+
+import pytest
+
+from generators import Grid, Named, RandomRegular
+from localsearch import DominatingSetSearch, VertexCoverSearch
+from reference import IsCover, IsDominating, Optimum, RandomGraphs, WithLoops
+from solve import SolveGraph
+
+def Graphs():
+    # (name, graph[v] = set of neighbors)
+    return RandomGraphs((10, 16), (0.15, 0.3), range(3)) \
+        + [("regular", RandomRegular(16, 3, 1)), ("grid", Grid(4, 4)), ("petersen", Named("petersen"))]
+
+@pytest.mark.parametrize("name, graph", Graphs())
+def test_vertex_cover_search_reaches_the_optimum(name, graph):
+    optimum = Optimum("vc", graph)
+    found = []
+    search = VertexCoverSearch(graph, set(range(len(graph))))
+
+    def Found(size): # The cover just found is the current one
+        assert len(search.Current()) == size and IsCover(graph, search.Current())
+        found.append(size)
+
+    cover = search.Run(steps=20000, on_improve=Found, target=optimum)
+    assert IsCover(graph, cover)
+    assert len(cover) == optimum
+    assert found == sorted(found, reverse=True) and found[-1] == len(cover)
+
+@pytest.mark.parametrize("name, graph", Graphs())
+def test_vertex_cover_search_keeps_loops_in_the_cover(name, graph):
+    graph = WithLoops(graph, (0, 3))
+    cover = VertexCoverSearch(graph, set(range(len(graph)))).Run(steps=2000)
+    assert IsCover(graph, cover)
+    assert {0, 3} <= cover
+    assert len(cover) >= Optimum("vc", graph)
+
+@pytest.mark.parametrize("name, graph", Graphs())
+def test_dominating_set_search_reaches_the_optimum(name, graph):
+    optimum = Optimum("ds", graph)
+    dominating = DominatingSetSearch(graph, range(len(graph))).Run(steps=20000, target=optimum)
+    assert IsDominating(graph, dominating)
+    assert len(dominating) == optimum
+
+def test_run_needs_a_limit():
+    graph = Named("petersen")
+    with pytest.raises(ValueError):
+        VertexCoverSearch(graph, set(range(len(graph)))).Run()
+    with pytest.raises(ValueError):
+        DominatingSetSearch(graph, range(len(graph))).Run()
+
+@pytest.mark.parametrize("name, graph", Graphs())
+def test_solvers_with_local_search_match_plain_search(name, graph):
+    # Local search only supplies the first incumbent, so answers can't change
+    assert SolveGraph("vc", graph, engine="iterative", local_search=0.02)["result"] \
+        == Optimum("vc", graph)
+    assert SolveGraph("ds", graph, engine="iterative", local_search=0.02)["result"] \
+        == Optimum("ds", graph)
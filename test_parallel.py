@@ -0,0 +1,91 @@
+'''
+Tests for parallel.py: both schedules must find the reference optimum, and every
+incumbent the workers pass up must reach on_incumbent with stations forming a solution
+of its size.
+
+python3 -m pytest -q test_parallel.py
+'''
+
+import os
+
+import pytest
+
+import backup_power_solver
+import parallel
+import main
+from generators import FromEdges, Gnp, Named
+from parallel import ParallelSolver
+from reference import Cases, IsCover, IsDominating, Optimum, RandomGraphs
+
+def Disjoint(graph):
+    # Two copies of graph side by side
+    return [set(neighbors) for neighbors in graph] + [{len(graph) + u for u in neighbors} for neighbors in graph]
+
+def Graphs():
+    # (name, graph[v] = set of neighbors)
+    graphs = RandomGraphs((24,), (0.2,), range(2)) + RandomGraphs((40,), (0.1,), range(2))
+    graphs += [("petersen", Named("petersen")), ("two-gnp", Disjoint(Gnp(16, 0.2, 1)))]
+    return graphs
+
+def Incumbents(solver, schedule):
+    # Run solver on 2 workers and return its answer and every incumbent it reported
+    seen = []
+    solver.on_incumbent = seen.append
+    best = ParallelSolver(solver, workers=2, schedule=schedule).Solve()
+    return best, seen
+
+@pytest.mark.parametrize("name, graph, schedule", Cases(Graphs(), ("static", "stealing")))
+def test_vertex_cover_matches_plain_search(name, graph, schedule):
+    optimum = Optimum("vc", graph)
+    for preprocess in ("none", "kernel"):
+        best, seen = Incumbents(main.Solver(graph, engine="iterative", preprocess=preprocess, max_width=0), schedule)
+        assert best == optimum, preprocess
+        assert seen and seen[-1].size == optimum
+        for incumbent in seen:
+            assert incumbent.stations is not None, (preprocess, incumbent.size)
+            assert len(incumbent.stations) == incumbent.size
+            assert IsCover(graph, set(incumbent.stations))
+
+@pytest.mark.parametrize("name, graph, schedule", Cases(Graphs(), ("static", "stealing")))
+def test_dominating_set_matches_plain_search(name, graph, schedule):
+    optimum = Optimum("ds", graph)
+    best, seen = Incumbents(backup_power_solver.Solver(graph, engine="iterative", max_width=0), schedule)
+    assert best == optimum
+    assert seen and seen[-1].size == optimum
+    for incumbent in seen:
+        assert incumbent.stations is not None, incumbent.size
+        assert len(incumbent.stations) == incumbent.size
+        assert IsDominating(graph, set(incumbent.stations))
+
+@pytest.mark.parametrize("schedule", ("static", "stealing"))
+def test_local_search_incumbent_keeps_its_stations(schedule):
+    # The local search cover is the first incumbent, so its stations must come with it
+    star = FromEdges(8, [(0, v) for v in range(1, 8)])
+    for name, graph in [("star", star)] + Graphs():
+        solver = main.Solver(graph, engine="iterative", preprocess="none", max_width=0, local_search=0.05)
+        best, seen = Incumbents(solver, schedule)
+        assert best == Optimum("vc", graph), name
+        assert IsCover(graph, set(solver.best_stations)) and len(solver.best_stations) == best, name
+        assert seen and seen[-1].size == best
+        for incumbent in seen:
+            assert IsCover(graph, set(incumbent.stations)) and len(incumbent.stations) == incumbent.size, name
+
+def test_greedy_preprocessing_proves_no_bound():
+    # Greedy stations may not be optimal, so a finished search only bounds by the matching
+    graph = Named("petersen")
+    solver = main.Solver(graph, engine="iterative", preprocess="greedy", max_width=0)
+    best = ParallelSolver(solver, workers=2).Solve()
+    assert best == 7 and solver.lower_bound <= Optimum("vc", graph)
+
+def RaisingPart(part):
+    raise ValueError("part failed")
+
+def DyingPart(part):
+    os._exit(3)  # No finally runs, as if the worker were killed
+
+@pytest.mark.parametrize("solve_part", (RaisingPart, DyingPart))
+def test_stealing_fails_instead_of_hanging_when_a_worker_does(monkeypatch, solve_part):
+    monkeypatch.setattr(parallel, "SolveGeneratorPart", solve_part)
+    solver = backup_power_solver.Solver(Gnp(24, 0.2, 0), engine="iterative", max_width=0, components=False)
+    with pytest.raises(RuntimeError):
+        ParallelSolver(solver, workers=2, schedule="stealing").Solve()
@@ -0,0 +1,120 @@
+'''
+Tests for server.py: requests are read into the same graphs the solvers get from a
+file, self-loops included, and a running server answers them with the reference optimum.
+
+python3 -m pytest -q test_server.py
+'''
+
+import asyncio
+import json
+import threading
+import time
+
+from generators import FromEdges, Gnp, Named
+from reference import Optimum
+from server import LINE_LIMIT, RequestGraph, RunJob, Server
+
+# (edges, vertices): graphs with self-loops, which force their vertex into any vertex cover
+LOOPED = [
+    ([[0, 0], [1, 1]], 2),
+    ([[0, 0], [0, 1], [1, 2]], 3),
+    ([[0, 1], [1, 2], [2, 3], [3, 0], [2, 2]], 5),
+]
+
+def test_request_graph_keeps_loops():
+    assert RequestGraph(dict(edges=[[0, 0], [0, 1]])) == [{0, 1}, {0}]
+    assert RequestGraph(dict(graph=[[0, 1], [], [2]])) == [{0, 1}, {0}, {2}]
+    assert RequestGraph(dict(edges=[[1, 1]], vertices=3)) == [set(), {1}, set()]
+
+async def Exchange(path, requests):
+    # Start a server on the Unix socket path, send it requests and return its answers by id
+    server = Server(workers=1)
+    await server.Start()
+    try:
+        listener = await asyncio.start_unix_server(server.Serve, path, limit=LINE_LIMIT)
+        async with listener:
+            reader, writer = await asyncio.open_unix_connection(path, limit=LINE_LIMIT)
+            for request in requests:
+                writer.write(json.dumps(request).encode() + b"\n")
+            await writer.drain()
+            answers = [json.loads(await reader.readline()) for _ in requests]
+            writer.close()
+            await writer.wait_closed()
+    finally:
+        server.Close()
+    return {answer["id"]: answer for answer in answers}
+
+def test_server_solves_looped_graphs(tmp_path):
+    requests = []
+    for i, (edges, vertices) in enumerate(LOOPED):
+        graph = [sorted(neighbors) for neighbors in FromEdges(vertices, edges)]
+        for problem in ("vc", "ds"):
+            requests.append(dict(id=f"{problem}-edges-{i}", problem=problem, edges=edges, vertices=vertices))
+            requests.append(dict(id=f"{problem}-graph-{i}", problem=problem, graph=graph))
+    answers = asyncio.run(Exchange(str(tmp_path / "server.sock"), requests))
+    for request in requests:
+        answer = answers[request["id"]]
+        graph = RequestGraph(request)
+        assert answer["status"] == "optimal", answer
+        assert answer["result"] == Optimum(request["problem"], graph), request["id"]
+        if request["problem"] == "vc":
+            loops = {v for v in range(len(graph)) if v in graph[v]}
+            assert loops <= set(answer["solution"]), request["id"]
+    assert answers["vc-edges-0"]["result"] == 2
+
+def test_greedy_answers_are_not_claimed_optimal(tmp_path):
+    # Greedy preprocessing gives petersen 7 stations where 6 will do
+    graph = [sorted(neighbors) for neighbors in Named("petersen")]
+    request = dict(id=1, problem="vc", graph=graph, options=dict(preprocess="greedy", max_width=0))
+    answer = asyncio.run(Exchange(str(tmp_path / "server.sock"), [request]))[1]
+    assert answer["status"] == "incumbent" and not answer["stopped"]
+    assert answer["result"] == 7 and answer["lower_bound"] <= Optimum("vc", Named("petersen"))
+
+# Local search on this graph runs until its time is up, far beyond the deadlines below
+SLOW = [sorted(neighbors) for neighbors in Gnp(400, 0.05, 1)]
+SLOW_OPTIONS = dict(local_search=60)
+
+def test_deadline_stops_local_search():
+    for problem in ("vc", "ds"):
+        start = time.monotonic()
+        answer = RunJob(problem, RequestGraph(dict(graph=SLOW)), "set", SLOW_OPTIONS, 0.5, None, threading.Event())
+        assert time.monotonic() - start < 10, problem
+        assert answer["status"] == "incumbent" and answer["stopped"], answer
+
+def test_cancel_stops_local_search():
+    for problem in ("vc", "ds"):
+        cancel = threading.Event()
+        threading.Timer(0.5, cancel.set).start()
+        start = time.monotonic()
+        answer = RunJob(problem, RequestGraph(dict(graph=SLOW)), "set", SLOW_OPTIONS, None, None, cancel)
+        assert time.monotonic() - start < 10, problem
+        assert answer["status"] == "cancelled" and answer["result"] is not None, answer
+
+async def CancelRunning(path):
+    # Send the slow request, cancel it once it is running and return both answers
+    server = Server(workers=1)
+    await server.Start()
+    try:
+        listener = await asyncio.start_unix_server(server.Serve, path, limit=LINE_LIMIT)
+        async with listener:
+            reader, writer = await asyncio.open_unix_connection(path, limit=LINE_LIMIT)
+            request = dict(id="slow", problem="vc", graph=SLOW, options=SLOW_OPTIONS)
+            writer.write(json.dumps(request).encode() + b"\n")
+            await writer.drain()
+            await asyncio.sleep(1)
+            writer.write(json.dumps({"cancel": "slow"}).encode() + b"\n")
+            await writer.drain()
+            answers = [json.loads(await reader.readline()) for _ in range(2)]
+            writer.close()
+            await writer.wait_closed()
+    finally:
+        server.Close()
+    return answers
+
+def test_server_cancels_a_running_request(tmp_path):
+    start = time.monotonic()
+    answers = asyncio.run(CancelRunning(str(tmp_path / "server.sock")))
+    assert time.monotonic() - start < 20
+    assert dict(cancel="slow", found=True) in answers
+    answer = next(answer for answer in answers if answer.get("id") == "slow")
+    assert answer["status"] == "cancelled" and answer["stopped"]
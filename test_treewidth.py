@@ -0,0 +1,74 @@
+'''
+Differential tests for treewidth.py: every heuristic must give a valid tree
+decomposition, and both DPs over it must match the reference search, for vertex cover
+and dominating set.
+
+python3 -m pytest -q test_treewidth.py
+'''
+
+import pytest
+
+from generators import Complete, FromEdges, Grid, Named
+from reference import Cases, IsCover, Optimum, RandomGraphs, WithLoops
+from solve import SolveGraph
+from treewidth import HEURISTICS, Decompose, MinDominatingSet, MinVertexCover
+
+def Graphs():
+    # (name, graph[v] = set of neighbors), mostly narrow enough for the dominating set DP
+    graphs = RandomGraphs((8, 12, 16), (0.1, 0.2), range(3))
+    graphs += [
+        ("tree", FromEdges(12, [(v, (v - 1) // 2) for v in range(1, 12)])),
+        ("cycle", FromEdges(9, [(v, (v + 1) % 9) for v in range(9)])),
+        ("grid", Grid(3, 5)),
+        ("complete", Complete(6)),
+        ("petersen", Named("petersen")),
+        ("isolated", FromEdges(6, [(0, 1), (1, 2)])),
+    ]
+    return graphs
+
+@pytest.mark.parametrize("name, graph, heuristic", Cases(Graphs(), HEURISTICS))
+def test_decomposition_is_valid(name, graph, heuristic):
+    decomposition = Decompose(graph, heuristic)
+    assert sorted(decomposition.order) == list(range(len(graph)))
+    position = {v: i for i, v in enumerate(decomposition.order)}
+    # Every edge is in the bag of whichever end is eliminated first
+    for a in range(len(graph)):
+        for b in graph[a]:
+            if a != b:
+                first, last = (a, b) if position[a] < position[b] else (b, a)
+                assert last in decomposition.separators[first]
+    # A separator is eliminated later, and all of it but the parent is in the parent's bag
+    for v in decomposition.order:
+        separator = decomposition.separators[v]
+        assert all(position[u] > position[v] for u in separator)
+        if separator:
+            parent = min(separator, key=position.__getitem__)
+            assert set(separator) - {parent} <= set(decomposition.separators[parent])
+            assert v in decomposition.children[parent]
+        assert len(separator) <= decomposition.width
+
+@pytest.mark.parametrize("name, graph, heuristic", Cases(Graphs(), HEURISTICS))
+def test_vertex_cover_dp_matches_plain_search(name, graph, heuristic):
+    for graph in (graph, WithLoops(graph, (0, len(graph) // 2))):
+        optimum = Optimum("vc", graph)
+        cover = set()
+        assert MinVertexCover(graph, Decompose(graph, heuristic), cover) == optimum
+        assert IsCover(graph, cover)
+        assert len(cover) == optimum
+
+@pytest.mark.parametrize("name, graph, heuristic", Cases(Graphs(), HEURISTICS))
+def test_dominating_set_dp_matches_plain_search(name, graph, heuristic):
+    optimum = Optimum("ds", graph)
+    assert MinDominatingSet(graph, Decompose(graph, heuristic)) == optimum
+
+def test_decompose_gives_up_above_max_width():
+    assert Decompose(Complete(8), "min_degree", max_width=3) is None
+    assert Decompose(Grid(3, 5), "min_degree", max_width=6) is not None
+
+@pytest.mark.parametrize("name, graph", Graphs())
+def test_solvers_by_decomposition_match_plain_search(name, graph):
+    # With max_width high enough, Solve goes by the DP for these graphs
+    assert SolveGraph("vc", graph, preprocess="none", engine="iterative", max_width=16, components=False)["result"] \
+        == Optimum("vc", graph)
+    assert SolveGraph("ds", graph, engine="iterative", max_width=8, components=False)["result"] \
+        == Optimum("ds", graph)
@@ -0,0 +1,189 @@
+'''
+Exact dynamic programming over a tree decomposition, for graphs of small treewidth
+(near-trees, series-parallel networks, ...). Runs in O(N * 2^width) for vertex cover
+and O(N * 8^width) at worst for dominating set, instead of branching.
+
+The decomposition comes from an elimination order picked greedily by a heuristic:
+eliminating v joins its remaining neighbors S(v) into a clique, and the bag of v is
+{v} + S(v). The parent of v's bag is the bag of whichever vertex of S(v) is
+eliminated first, and S(v) minus that vertex is inside the parent's bag, so the bags
+form a forest with a tree decomposition's properties. The DP walks the bags in
+elimination order; each table is indexed by assignments to S(v) and covers every
+vertex eliminated in the subtree below.
+'''
+
+import heapq
+
+HEURISTICS = ("min_degree", "min_fill")
+
+# Eliminations between calls to Decompose's check
+CHECK_EVERY = 1024
+
+class Decomposition:
+    def __init__(self, order, separators, width):
+        self.order = order            # Elimination order, children before parents
+        self.separators = separators  # separators[v]: S(v), the rest of v's bag
+        self.width = width            # Largest bag size minus one
+        position = {v: i for i, v in enumerate(order)}
+        self.children = {v: [] for v in order}
+        for v in order:
+            if separators[v]:
+                self.children[min(separators[v], key=position.__getitem__)].append(v)
+
+def Decompose(graph, heuristic="min_degree", max_width=None, check=None):
+    '''
+    Tree decomposition of graph (graph[v] is the set of neighbors of v) from a
+    heuristic elimination order. Returns None as soon as the width would exceed max_width.
+    check, if given, is called every CHECK_EVERY eliminations and may raise to give up.
+    '''
+    vertices = graph if isinstance(graph, dict) else range(len(graph))
+    adj = {v: set(graph[v]) - {v} for v in vertices}
+
+    def Score(v):
+        if heuristic == "min_degree":
+            return len(adj[v])
+        # Fill-in: edges missing between the neighbors of v
+        neighbors = adj[v]
+        return sum(len(neighbors - adj[u]) - 1 for u in neighbors) // 2
+
+    # Lazy heap: entries go stale when scores change, and are re-checked when popped.
+    # Only the neighbors of an eliminated vertex get fresh entries, so min_fill is approximate.
+    heap = [(Score(v), v) for v in adj]
+    heapq.heapify(heap)
+    order = []
+    separators = {}
+    width = 0
+    while heap:
+        score, v = heapq.heappop(heap)
+        if v not in adj:
+            continue
+        current = Score(v)
+        if current != score:
+            heapq.heappush(heap, (current, v))
+            continue
+        neighbors = adj.pop(v)
+        if max_width is not None and len(neighbors) > max_width:
+            return None
+        width = max(width, len(neighbors))
+        order.append(v)
+        if check is not None and len(order) % CHECK_EVERY == 0:
+            check()
+        separators[v] = list(neighbors)
+        for u in neighbors:
+            adj[u].discard(v)
+            adj[u] |= neighbors - {u}
+        for u in neighbors:
+            heapq.heappush(heap, (Score(u), u))
+    return Decomposition(order, separators, width)
+
+def ChildPositions(decomposition, v, index):
+    # For each child c of v: c and where each vertex of S(c) sits in v's bag
+    return [(c, [index[u] for u in decomposition.separators[c]]) for c in decomposition.children[v]]
+
+def Project(assignment, positions):
+    # Bits of assignment (over v's bag) at positions, packed into a child's separator mask
+    mask = 0
+    for i, p in enumerate(positions):
+        if assignment >> p & 1:
+            mask |= 1 << i
+    return mask
+
+def MinVertexCover(graph, decomposition, cover=None):
+    '''
+    Size of a minimum vertex cover; if cover (a set) is given, one is added to it. In v's
+    bag, bit 0 is v and bit i is S(v)[i - 1]. tables[v][s] is the fewest stations among
+    the vertices eliminated up to v (its subtree) covering every edge at them, when S(v)
+    has stations exactly at the bits of s, and choices[v][s] whether v has one then.
+    '''
+    infinity = len(decomposition.order) + 1
+    tables = {}
+    choices = {}
+    total = 0
+    for v in decomposition.order:
+        separator = decomposition.separators[v]
+        index = {v: 0}
+        index.update((u, i + 1) for i, u in enumerate(separator))
+        # Without a station, v needs one at every neighbor still in the bag (and can't have a loop)
+        needed = sum(1 << index[u] for u in graph[v] if u in index and u != v)
+        loop = v in graph[v]
+        children = [(tables.pop(c), positions) for c, positions in ChildPositions(decomposition, v, index)]
+        table = [infinity] * (1 << len(separator))
+        choice = [0] * (1 << len(separator))
+        for assignment in range(1 << (len(separator) + 1)):
+            station = assignment & 1
+            if not station and (loop or assignment & needed != needed):
+                continue
+            cost = station
+            for child_table, positions in children:
+                cost += child_table[Project(assignment, positions)]
+            if cost < table[assignment >> 1]:
+                table[assignment >> 1] = cost
+                choice[assignment >> 1] = station
+        choices[v] = choice
+        if separator:
+            tables[v] = table
+        else:
+            total += table[0]
+    if cover is not None:
+        # Parents are decided before their children, and S(v) is decided before v
+        for v in reversed(decomposition.order):
+            s = sum(1 << i for i, u in enumerate(decomposition.separators[v]) if u in cover)
+            if choices[v][s]:
+                cover.add(v)
+    return total
+
+def MinDominatingSet(graph, decomposition):
+    '''
+    Size of a minimum dominating set. tables[v][s] maps d to the fewest generators among
+    the vertices eliminated up to v (its subtree) dominating all of them, when S(v) has
+    generators exactly at the bits of s and the other S(v) vertices dominated by the
+    subtree are the bits of d.
+    '''
+    infinity = len(decomposition.order) + 1
+    tables = {}
+    total = 0
+    for v in decomposition.order:
+        separator = decomposition.separators[v]
+        index = {v: 0}
+        index.update((u, i + 1) for i, u in enumerate(separator))
+        neighbors = sum(1 << index[u] for u in graph[v] if u in index and u != v)
+        children = []
+        for c, positions in ChildPositions(decomposition, v, index):
+            # lift[d]: a child's dominated mask d moved to bag positions
+            lift = [0] * (1 << len(positions))
+            for mask in range(1 << len(positions)):
+                for i, p in enumerate(positions):
+                    if mask >> i & 1:
+                        lift[mask] |= 1 << p
+            children.append((tables.pop(c), positions, lift))
+        table = {}
+        for assignment in range(1 << (len(separator) + 1)):
+            station = assignment & 1
+            # Dominated so far (bit 0: v itself): v and its bag neighbors if v has a generator
+            states = {(neighbors | 1) if station else 0: station}
+            for child_table, positions, lift in children:
+                entries = child_table.get(Project(assignment, positions))
+                if not entries:
+                    states = {}
+                    break
+                merged = {}
+                for dominated, cost in states.items():
+                    for child_dominated, child_cost in entries.items():
+                        key = dominated | lift[child_dominated]
+                        if cost + child_cost < merged.get(key, infinity):
+                            merged[key] = cost + child_cost
+                states = merged
+            for dominated, cost in states.items():
+                # v is forgotten here, so it must be dominated by now
+                if not (dominated & 1 or assignment & neighbors):
+                    continue
+                generators = assignment >> 1
+                bucket = table.setdefault(generators, {})
+                key = (dominated >> 1) & ~generators
+                if cost < bucket.get(key, infinity):
+                    bucket[key] = cost
+        if separator:
+            tables[v] = table
+        else:
+            total += min(table[0].values())
+    return total